@@ -6,7 +6,9 @@ def calc_splines(path: np.ndarray,
                  el_lengths: np.ndarray = None,
                  psi_s: float = None,
                  psi_e: float = None,
-                 use_dist_scaling: bool = True) -> tuple:
+                 use_dist_scaling: bool = True,
+                 solver: str = "dense",
+                 return_M: bool = True) -> tuple:
     """
     author:
     Tim Stahl & Alexander Heilmeier
@@ -37,13 +39,19 @@ def calc_splines(path: np.ndarray,
     :param use_dist_scaling:    bool flag to indicate if heading and curvature scaling should be performed. This should
                                 be done if the distances between the points in the path are not equal.
     :type use_dist_scaling:     bool
+    :param solver:              "dense" solves the full LES with M, "banded" reduces it to a (cyclic) tridiagonal system
+                                in the heading of every point, which is O(n) in time and memory.
+    :type solver:               str
+    :param return_M:            bool flag to indicate if M should be set up and returned. Without it the banded solver
+                                never allocates the (4n x 4n) matrix and None is returned instead.
+    :type return_M:             bool
 
     .. outputs::
     :return x_coeff:            spline coefficients of the x-component.
     :rtype x_coeff:             np.ndarray
     :return y_coeff:            spline coefficients of the y-component.
     :rtype y_coeff:             np.ndarray
-    :return M:                  LES coefficients.
+    :return M:                  LES coefficients (None if return_M is False and the banded solver is used).
     :rtype M:                   np.ndarray
     :return normvec_normalized: normalized normal vectors [x, y].
     :rtype normvec_normalized:  np.ndarray
@@ -70,6 +78,9 @@ def calc_splines(path: np.ndarray,
     if el_lengths is not None and path.shape[0] != el_lengths.size + 1:
         raise RuntimeError("el_lengths input must be one element smaller than path input!")
 
+    if solver not in ("dense", "banded"):
+        raise RuntimeError("solver must be either 'dense' or 'banded'!")
+
     # if distances between path coordinates are not provided but required, calculate euclidean distances as el_lengths
     if use_dist_scaling and el_lengths is None:
         el_lengths = np.sqrt(np.sum(np.power(np.diff(path, axis=0), 2), axis=1))
@@ -90,6 +101,72 @@ def calc_splines(path: np.ndarray,
     else:
         scaling = np.ones(no_splines - 1)
 
+    # the banded solver does not need M, so only set it up if it is requested or used for solving
+    if solver == "dense" or return_M:
+        M, b_x, b_y = calc_les(path=path,
+                               el_lengths=el_lengths,
+                               psi_s=psi_s,
+                               psi_e=psi_e,
+                               scaling=scaling,
+                               closed=closed)
+    else:
+        M = None
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # SOLVE ------------------------------------------------------------------------------------------------------------
+    # ------------------------------------------------------------------------------------------------------------------
+
+    if solver == "dense":
+        # solve x and y together as one system with two right hand sides
+        les = np.linalg.solve(M, np.hstack((b_x, b_y)))
+
+        # get coefficients of every piece into one row -> reshape
+        coeffs_x = np.reshape(les[:, 0], (no_splines, 4))
+        coeffs_y = np.reshape(les[:, 1], (no_splines, 4))
+
+    else:
+        coeffs_x, coeffs_y = calc_coeffs_banded(path=path,
+                                                el_lengths=el_lengths,
+                                                psi_s=psi_s,
+                                                psi_e=psi_e,
+                                                scaling=scaling,
+                                                closed=closed,
+                                                use_dist_scaling=use_dist_scaling)
+
+    # get normal vector (behind used here instead of ahead for consistency with other functions) (second coefficient of
+    # cubic splines is relevant for the heading)
+    normvec = np.stack((coeffs_y[:, 1], -coeffs_x[:, 1]), axis=1)
+
+    # normalize normal vectors
+    norm_factors = 1.0 / np.sqrt(np.sum(np.power(normvec, 2), axis=1))
+    normvec_normalized = np.expand_dims(norm_factors, axis=1) * normvec
+
+    return coeffs_x, coeffs_y, M, normvec_normalized
+
+
+def calc_les(path: np.ndarray,
+             el_lengths: np.ndarray,
+             psi_s: float,
+             psi_e: float,
+             scaling: np.ndarray,
+             closed: bool) -> tuple:
+    """
+    .. description::
+    Set up the dense linear equation system M * a_{x,y} = b_{x,y} solved by calc_splines. Inputs are prepared by
+    calc_splines (el_lengths already extended for closed paths).
+
+    .. outputs::
+    :return M:                  LES coefficients.
+    :rtype M:                   np.ndarray
+    :return b_x:                right hand side of the x-component.
+    :rtype b_x:                 np.ndarray
+    :return b_y:                right hand side of the y-component.
+    :rtype b_y:                 np.ndarray
+    """
+
+    # get number of splines
+    no_splines = path.shape[0] - 1
+
     # ------------------------------------------------------------------------------------------------------------------
     # DEFINE LINEAR EQUATION SYSTEM ------------------------------------------------------------------------------------
     # ------------------------------------------------------------------------------------------------------------------
@@ -174,26 +251,320 @@ def calc_splines(path: np.ndarray,
         # b_x[-1] = 0
         # b_y[-1] = 0
 
+    return M, b_x, b_y
+
+
+def calc_coeffs_banded(path: np.ndarray,
+                       el_lengths: np.ndarray,
+                       psi_s: float,
+                       psi_e: float,
+                       scaling: np.ndarray,
+                       closed: bool,
+                       use_dist_scaling: bool) -> tuple:
+    """
+    .. description::
+    Solve the same equation system as calc_les without setting up M. Every spline is written in Hermite form using
+    the heading (first derivative) at its start and end point. Heading continuity links the end heading of one spline
+    to the start heading of the next, and curvature continuity then leaves one equation per point:
+
+    2 * m_i + 4 * (1 + s_i) * m_i+1 + 2 * s_i * m_i+2 = 6 * (dp_i + s_i² * dp_i+1) / l_i
+
+    with s_i the scaling factors, l_i the element lengths (ones without distance scaling), dp_i = p_i+1 - p_i and
+    m_i = a_1i / l_i. The system is tridiagonal (cyclic for closed paths), diagonally dominant and solved for x and y
+    at once in O(n).
+
+    .. outputs::
+    :return x_coeff:            spline coefficients of the x-component.
+    :rtype x_coeff:             np.ndarray
+    :return y_coeff:            spline coefficients of the y-component.
+    :rtype y_coeff:             np.ndarray
+    """
+
+    no_splines = path.shape[0] - 1
+
+    # element lengths matching the scaling factors (s_i = l_i / l_i+1)
+    if use_dist_scaling:
+        lengths = el_lengths[:no_splines]
+    else:
+        lengths = np.ones(no_splines)
+
+    # differences between consecutive points
+    dp = np.diff(path, axis=0)
+
+    if closed:
+        s = scaling[:no_splines] if use_dist_scaling else np.ones(no_splines)
+
+        # equation i is placed in row i + 1 so that m_i+1 is on the diagonal
+        s_prev = np.roll(s, 1)
+        lengths_prev = np.roll(lengths, 1)
+        sub = np.full(no_splines, 2.0)
+        diag = 4 * (1 + s_prev)
+        sup = 2 * s_prev
+        rhs = 6 * (np.roll(dp, 1, axis=0) + np.expand_dims(np.power(s_prev, 2), 1) * dp) / np.expand_dims(lengths_prev, 1)
+
+        m = solve_cyclic_tridiagonal(sub, diag, sup, rhs)
+
+        # heading at the start and end of every spline
+        d_s = np.expand_dims(lengths, 1) * m
+        d_e = np.expand_dims(lengths, 1) * np.roll(m, -1, axis=0)
+
+    else:
+        # fixed headings at the start and end point
+        el_length_s = 1.0 if el_lengths is None else el_lengths[0]
+        el_length_e = 1.0 if el_lengths is None else el_lengths[-1]
+        head_s = np.array([math.cos(psi_s + math.pi / 2), math.sin(psi_s + math.pi / 2)]) * el_length_s
+        head_e = np.array([math.cos(psi_e + math.pi / 2), math.sin(psi_e + math.pi / 2)]) * el_length_e
+
+        m = np.zeros((no_splines, 2))
+        m[0] = head_s / lengths[0]
+
+        if no_splines > 1:
+            # unknowns m_1 ... m_n-1, row k holds equation k - 1
+            s = scaling[:no_splines - 1] if use_dist_scaling else np.ones(no_splines - 1)
+            sub = np.full(no_splines - 1, 2.0)
+            diag = 4 * (1 + s)
+            sup = 2 * s
+            rhs = 6 * (dp[:-1] + np.expand_dims(np.power(s, 2), 1) * dp[1:]) / np.expand_dims(lengths[:-1], 1)
+
+            # move known start and end headings to the right hand side
+            rhs[0] -= 2 * m[0]
+            rhs[-1] -= 2 * math.pow(s[-1], 2) * head_e / lengths[-2]
+
+            m[1:] = solve_tridiagonal(sub, diag, sup, rhs)
+
+        d_s = np.expand_dims(lengths, 1) * m
+        d_e = np.vstack((np.expand_dims(lengths[:-1], 1) * m[1:], head_e))
+
+    # Hermite form -> polynomial coefficients a_0i, a_1i, a_2i, a_3i
+    coeffs = np.stack((path[:-1],
+                       d_s,
+                       3 * dp - 2 * d_s - d_e,
+                       -2 * dp + d_s + d_e), axis=1)
+
+    return coeffs[:, :, 0], coeffs[:, :, 1]
+
+
+def calc_splines_batch(paths: list,
+                       el_lengths: list = None,
+                       use_dist_scaling: bool = True,
+                       no_points: np.ndarray = None) -> tuple:
+    """
+    .. description::
+    Solve for curvature continuous cubic splines through many closed paths at once. The equation systems of all paths
+    (see calc_coeffs_banded) are padded to the longest path and solved together, so the cost is one O(n) sweep over
+    the longest path with every step vectorized over all paths.
+
+    .. inputs::
+    :param paths:               list of closed paths (x and y coordinates), or a padded array of shape
+                                (no_paths, max_no_points, 2) together with no_points.
+    :type paths:                list
+    :param el_lengths:          list of distances between path points of every path (optional).
+    :type el_lengths:           list
+    :param use_dist_scaling:    bool flag to indicate if heading and curvature scaling should be performed.
+    :type use_dist_scaling:     bool
+    :param no_points:           number of valid (closed) points of every path in a padded array.
+    :type no_points:            np.ndarray
+
+    .. outputs::
+    :return x_coeff:            list of spline coefficients of the x-component of every path.
+    :rtype x_coeff:             list
+    :return y_coeff:            list of spline coefficients of the y-component of every path.
+    :rtype y_coeff:             list
+    :return normvec_normalized: list of normalized normal vectors [x, y] of every path.
+    :rtype normvec_normalized:  list
+
+    .. notes::
+    Outputs are always unclosed! Only closed paths are supported, unclosed paths need individual headings and have
+    to be handled by calc_splines.
+    """
+
+    # split padded stacks into single paths
+    if isinstance(paths, np.ndarray) and paths.ndim == 3:
+        if no_points is None:
+            no_points = np.full(paths.shape[0], paths.shape[1])
+        paths = [paths[k, :no_points[k]] for k in range(paths.shape[0])]
+
+    no_paths = len(paths)
+
+    if el_lengths is None:
+        el_lengths = [None] * no_paths
+
+    # check inputs
+    for path in paths:
+        if not np.all(np.isclose(path[0], path[-1])):
+            raise RuntimeError("Batched spline calculation requires closed paths!")
+
+    no_splines = np.array([path.shape[0] - 1 for path in paths])
+
+    if np.any(no_splines < 3):
+        raise RuntimeError("Batched spline calculation requires at least three splines per path!")
+
+    max_splines = np.max(no_splines)
+
     # ------------------------------------------------------------------------------------------------------------------
-    # SOLVE ------------------------------------------------------------------------------------------------------------
+    # PAD PATHS --------------------------------------------------------------------------------------------------------
     # ------------------------------------------------------------------------------------------------------------------
 
-    x_les = np.squeeze(np.linalg.solve(M, b_x))  # squeeze removes single-dimensional entries
-    y_les = np.squeeze(np.linalg.solve(M, b_y))
+    valid = np.arange(max_splines)[None, :] < no_splines[:, None]
 
-    # get coefficients of every piece into one row -> reshape
-    coeffs_x = np.reshape(x_les, (no_splines, 4))
-    coeffs_y = np.reshape(y_les, (no_splines, 4))
+    dp = np.zeros((no_paths, max_splines, 2))
+    lengths = np.ones((no_paths, max_splines))
 
-    # get normal vector (behind used here instead of ahead for consistency with other functions) (second coefficient of
-    # cubic splines is relevant for the heading)
-    normvec = np.stack((coeffs_y[:, 1], -coeffs_x[:, 1]), axis=1)
+    for k, path in enumerate(paths):
+        dp[k, :no_splines[k]] = np.diff(path, axis=0)
 
-    # normalize normal vectors
-    norm_factors = 1.0 / np.sqrt(np.sum(np.power(normvec, 2), axis=1))
-    normvec_normalized = np.expand_dims(norm_factors, axis=1) * normvec
+        if use_dist_scaling:
+            if el_lengths[k] is None:
+                lengths[k, :no_splines[k]] = np.sqrt(np.sum(np.power(dp[k, :no_splines[k]], 2), axis=1))
+            else:
+                lengths[k, :no_splines[k]] = el_lengths[k]
 
-    return coeffs_x, coeffs_y, M, normvec_normalized
+    # previous and next spline of every spline within its own path (cyclic)
+    inds = np.arange(max_splines)[None, :]
+    prev_inds = np.where(valid, (inds - 1) % no_splines[:, None], inds)
+    next_inds = np.where(valid, (inds + 1) % no_splines[:, None], inds)
+
+    # scaling factors s_i = l_i / l_i+1
+    s = lengths / np.take_along_axis(lengths, next_inds, axis=1)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # SET UP AND SOLVE ALL SYSTEMS -------------------------------------------------------------------------------------
+    # ------------------------------------------------------------------------------------------------------------------
+
+    # equation i is placed in row i + 1 (see calc_coeffs_banded), padding rows are decoupled identities
+    s_prev = np.take_along_axis(s, prev_inds, axis=1)
+    lengths_prev = np.take_along_axis(lengths, prev_inds, axis=1)
+    dp_prev = np.take_along_axis(dp, prev_inds[:, :, None], axis=1)
+
+    sub = np.where(valid, 2.0, 0.0)
+    diag = np.where(valid, 4 * (1 + s_prev), 1.0)
+    sup = np.where(valid & (inds < no_splines[:, None] - 1), 2 * s_prev, 0.0)
+    corner = 2 * np.take_along_axis(s_prev, no_splines[:, None] - 1, axis=1)[:, 0]
+    rhs = 6 * (dp_prev + np.power(s_prev, 2)[:, :, None] * dp) / lengths_prev[:, :, None]
+    rhs[~valid] = 0.0
+
+    # solver works along the first axis
+    m = solve_cyclic_tridiagonal(sub.T, diag.T, sup.T, np.transpose(rhs, (1, 0, 2)),
+                                 sizes=no_splines, corner=corner)
+    m = np.transpose(m, (1, 0, 2))
+
+    # heading at the start and end of every spline
+    d_s = lengths[:, :, None] * m
+    d_e = lengths[:, :, None] * np.take_along_axis(m, next_inds[:, :, None], axis=1)
+
+    # Hermite form -> polynomial coefficients a_0i, a_1i, a_2i, a_3i
+    coeffs_x = []
+    coeffs_y = []
+    normvecs_normalized = []
+
+    for k, path in enumerate(paths):
+        n = no_splines[k]
+        coeffs = np.stack((path[:-1],
+                           d_s[k, :n],
+                           3 * dp[k, :n] - 2 * d_s[k, :n] - d_e[k, :n],
+                           -2 * dp[k, :n] + d_s[k, :n] + d_e[k, :n]), axis=1)
+        coeffs_x.append(coeffs[:, :, 0])
+        coeffs_y.append(coeffs[:, :, 1])
+
+        # normal vectors (see calc_splines)
+        normvec = np.stack((coeffs[:, 1, 1], -coeffs[:, 1, 0]), axis=1)
+        normvecs_normalized.append(normvec / np.sqrt(np.sum(np.power(normvec, 2), axis=1, keepdims=True)))
+
+    return coeffs_x, coeffs_y, normvecs_normalized
+
+
+def solve_tridiagonal(sub: np.ndarray,
+                      diag: np.ndarray,
+                      sup: np.ndarray,
+                      rhs: np.ndarray) -> np.ndarray:
+    """
+    .. description::
+    Solve a tridiagonal equation system with the Thomas algorithm in O(n). sub[0] and sup[-1] are ignored. The
+    coefficients may have extra trailing dimensions to solve many systems at once, and rhs may have further trailing
+    dimensions for several right hand sides.
+    """
+
+    n = diag.shape[0]
+    c = np.zeros(diag.shape)
+    d = np.array(rhs, dtype=float)
+
+    # align coefficients with the right hand side dimensions
+    expand = (Ellipsis,) + (None,) * (d.ndim - diag.ndim)
+
+    # forward sweep
+    c[0] = sup[0] / diag[0]
+    d[0] = d[0] / diag[0][expand]
+    for i in range(1, n):
+        denom = diag[i] - sub[i] * c[i - 1]
+        c[i] = sup[i] / denom
+        d[i] = (d[i] - sub[i][expand] * d[i - 1]) / denom[expand]
+
+    # back substitution
+    for i in range(n - 2, -1, -1):
+        d[i] -= c[i][expand] * d[i + 1]
+
+    return d
+
+
+def solve_cyclic_tridiagonal(sub: np.ndarray,
+                             diag: np.ndarray,
+                             sup: np.ndarray,
+                             rhs: np.ndarray,
+                             sizes: np.ndarray = None,
+                             corner: np.ndarray = None) -> np.ndarray:
+    """
+    .. description::
+    Solve a cyclic tridiagonal equation system (sub[0] in the last column of the first row, sup[-1] in the first
+    column of the last row) in O(n) using the Sherman-Morrison formula. rhs may hold several right hand sides as
+    columns.
+
+    Many systems can be solved at once by giving the coefficients a trailing dimension. Systems shorter than the first
+    dimension then pass their size in sizes and the first column of their last row in corner, and have to be padded
+    with decoupled rows (sub = sup = 0, diag = 1, rhs = 0).
+    """
+
+    n = diag.shape[0]
+
+    # small systems wrap onto themselves -> solve directly
+    if sizes is None and n < 3:
+        A = np.zeros((n, n))
+        for i in range(n):
+            A[i, (i - 1) % n] += sub[i]
+            A[i, i] += diag[i]
+            A[i, (i + 1) % n] += sup[i]
+        return np.linalg.solve(A, rhs)
+
+    # index of the last row of every system
+    if sizes is None:
+        last = np.full(diag.shape[1:], n - 1)
+    else:
+        last = np.asarray(sizes) - 1
+    last_row = last[None, ...]
+
+    alpha = np.take_along_axis(sup, last_row, axis=0)[0] if corner is None else corner
+    beta = np.asarray(sub[0])
+    gamma = -np.asarray(diag[0])
+
+    # remove the corner elements from the matrix and correct afterwards
+    diag_mod = np.copy(diag)
+    diag_mod[0] -= gamma
+    np.put_along_axis(diag_mod, last_row, (np.take_along_axis(diag_mod, last_row, axis=0)[0] - alpha * beta / gamma)[None, ...], axis=0)
+
+    x = solve_tridiagonal(sub, diag_mod, sup, rhs)
+
+    u = np.zeros(diag.shape)
+    u[0] = gamma
+    np.put_along_axis(u, last_row, np.asarray(alpha)[None, ...], axis=0)
+    z = solve_tridiagonal(sub, diag_mod, sup, u)
+
+    # align coefficients with the right hand side dimensions
+    expand = (Ellipsis,) + (None,) * (x.ndim - diag.ndim)
+    x_last = np.take_along_axis(x, last_row[expand], axis=0)[0]
+    z_last = np.take_along_axis(z, last_row, axis=0)[0]
+
+    factor = (x[0] + beta[expand] * x_last / gamma[expand]) / (1 + z[0] + beta * z_last / gamma)[expand]
+
+    return x - z[expand] * factor[None, ...]
 
 
 # testing --------------------------------------------------------------------------------------------------------------
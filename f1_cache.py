@@ -0,0 +1,339 @@
+from collections import OrderedDict
+import f1_helper_functions as f1help
+import hashlib
+import json
+import os
+import pandas as pd
+import pickle as pkl
+import tempfile
+
+class RaceCache:
+    """ On-disk cache of prepared race data
+
+    Entries are pickled to <cache_dir>/<key>.pkl where key is a hash of everything
+    that changes the result (see make_key). Writes are atomic and, when max_bytes
+    is set, the least recently used entries are evicted to stay under the limit.
+    """
+
+    def __init__(self, cache_dir="race_data", max_bytes=None):
+        """ Initialize the cache
+
+        Keyword Arguments:
+            cache_dir (str) - path to cache directory
+            max_bytes (int) - size limit of the cache directory (None for no limit)
+        """
+
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def make_key(self, session=None, interval=0.1, until=None, channels=None):
+        """ Get the cache key for resampled data from a session
+
+        Keyword Arguments:
+            session (fastf1.core.Session) - session the data comes from (does not need to be loaded)
+            interval (float) - time in seconds between each datapoint
+            until (float or str) - end time passed to get_telemetry_in_intervals
+            channels (dict) - column : resampling policy pairs passed to get_telemetry_in_intervals
+        """
+
+        if(session is None):
+            raise Exception("Must supply a session")
+
+        if(channels is None):
+            channels = f1help.POSITION_CHANNELS
+
+        description = {
+                       "year": int(session.event.EventDate.year),
+                       "round": int(session.event.RoundNumber),
+                       "session": session.name,
+                       "interval": float(interval),
+                       "until": until if isinstance(until, str) or until is None else float(until),
+                       "channels": sorted(channels.items()),
+                       "version": f1help.RESAMPLE_VERSION
+        }
+
+        return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+    def get_path(self, key):
+        """ Get the file path of a cache entry
+
+        Keyword Arguments:
+            key (str) - cache key
+        """
+
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def get(self, key):
+        """ Get a cached entry, or None if it is not cached
+
+        Keyword Arguments:
+            key (str) - cache key
+        """
+
+        path = self.get_path(key)
+
+        try:
+            with open(path, "rb") as f:
+                data = pkl.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (pkl.UnpicklingError, EOFError):
+            # Treat unreadable entries as missing so they are rebuilt
+            os.remove(path)
+            self.misses += 1
+            return None
+
+        # Mark entry as recently used
+        os.utime(path)
+        self.hits += 1
+
+        return data
+
+    def put(self, key, data):
+        """ Store an entry, replacing any existing entry atomically
+
+        Keyword Arguments:
+            key (str) - cache key
+            data (object) - picklable data to store
+        """
+
+        # Write to a temporary file first so readers never see a partial entry
+        f = tempfile.NamedTemporaryFile(dir=self.cache_dir, suffix=".tmp", delete=False)
+        try:
+            with f:
+                pkl.dump(data, f, protocol=pkl.HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(f.name, self.get_path(key))
+        except BaseException:
+            os.remove(f.name)
+            raise
+
+        if(self.max_bytes is not None):
+            self.evict(self.max_bytes, keep=key)
+
+    def get_entries(self):
+        """ Get (path, size, last used time) of every entry, least recently used first
+        """
+
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if(name.endswith(".pkl")):
+                try:
+                    stat = os.stat(os.path.join(self.cache_dir, name))
+                except FileNotFoundError:
+                    # Removed by another process since listing
+                    continue
+                entries.append((os.path.join(self.cache_dir, name), stat.st_size, stat.st_mtime))
+
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def evict(self, max_bytes=None, keep=None):
+        """ Remove least recently used entries until the cache fits in max_bytes
+
+        Keyword Arguments:
+            max_bytes (int) - size to shrink the cache to (defaults to the cache's limit)
+            keep (str) - key of an entry that should never be evicted
+        """
+
+        if(max_bytes is None):
+            max_bytes = self.max_bytes
+
+        if(max_bytes is None):
+            raise Exception("Must supply max_bytes")
+
+        entries = self.get_entries()
+        total = sum(size for _, size, _ in entries)
+
+        for path, size, _ in entries:
+            if(total <= max_bytes):
+                break
+            if(keep is not None and path == self.get_path(keep)):
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def stats(self):
+        """ Get the hits and misses of this cache object along with the number and size of stored entries
+        """
+
+        entries = self.get_entries()
+
+        return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(entries),
+                "bytes": sum(size for _, size, _ in entries)
+        }
+
+class SessionRegistry:
+    """ In-process registry of fastf1 sessions keyed by (year, round, session name)
+
+    Asking for the same session again returns the same object, along with every
+    part of it already loaded (see f1_helper_functions.load_session_data). When
+    more than max_sessions are held, or the loaded data of the held sessions is
+    estimated to take more than max_bytes (see get_session_bytes), the least
+    recently used ones are dropped. The most recently used session is always kept.
+    Events are kept the same way, up to max_events of them.
+    """
+
+    def __init__(self, max_sessions=4, max_bytes=None, max_events=16):
+        """ Initialize the registry
+
+        Keyword Arguments:
+            max_sessions (int) - number of sessions to keep (None for no limit)
+            max_bytes (int) - estimated size of the loaded data to keep (None for no limit)
+            max_events (int) - number of events to keep (None for no limit)
+        """
+
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.max_events = max_events
+        self.hits = 0
+        self.misses = 0
+
+        self.events = OrderedDict()
+        self.sessions = OrderedDict()
+
+    def get_event(self, year=2022, gp=1):
+        """ Get an event, creating it the first time it is asked for
+
+        Keyword Arguments:
+            year (int) - year of season
+            gp (int or str) - event/round/weekend identifier (round number or name)
+        """
+
+        if((year, gp) in self.events):
+            self.events.move_to_end((year, gp))
+        else:
+            self.events[(year, gp)] = f1help.get_event(year, gp)
+
+            while(self.max_events is not None and len(self.events) > self.max_events):
+                self.events.popitem(last=False)
+
+        return self.events[(year, gp)]
+
+    def make_key(self, year=2022, gp=1, session=5):
+        """ Get the registry key of a session
+
+        Keyword Arguments:
+            year (int) - year of season
+            gp (int or str) - event/round/weekend identifier (round number or name)
+            session (int or str) - session identifier (number or name)
+        """
+
+        event = self.get_event(year, gp)
+
+        return (int(year), int(event.RoundNumber), event.get_session_name(session))
+
+    def get_session(self, year=2022, gp=1, session=5, parts=None):
+        """ Get a session, loading any of the requested parts it does not have yet
+
+        Keyword Arguments:
+            year (int) - year of season
+            gp (int or str) - event/round/weekend identifier (round number or name)
+            session (int or str) - session identifier (number or name)
+            parts (list) - parts of f1_helper_functions.SESSION_PARTS to load (None for all, empty for none)
+        """
+
+        key = self.make_key(year, gp, session)
+
+        if(key in self.sessions):
+            self.hits += 1
+            self.sessions.move_to_end(key)
+        else:
+            self.misses += 1
+            self.sessions[key] = f1help.get_session_from_event(self.get_event(year, gp), session)
+
+        if(parts is None or len(parts)):
+            f1help.load_session_data(self.sessions[key], parts)
+
+        self.evict()
+
+        return self.sessions[key]
+
+    def get_session_bytes(self, session=None):
+        """ Estimate the memory taken by the data loaded into a session
+        Counts the DataFrames held by the session, directly or in a dict (car_data and pos_data are
+        dicts of one per driver). Object columns are counted by their pointers only, so this is a
+        lower bound.
+
+        Keyword Arguments:
+            session (fastf1.core.Session) - session to measure
+        """
+
+        if(session is None):
+            raise Exception("Must supply a session")
+
+        size = 0
+
+        for value in vars(session).values():
+            frames = value.values() if isinstance(value, dict) else [value]
+            size += sum(int(frame.memory_usage(index=True).sum()) for frame in frames if isinstance(frame, pd.DataFrame))
+
+        return size
+
+    def get_bytes(self):
+        """ Estimate the memory taken by the data loaded into every held session
+        """
+
+        return sum(self.get_session_bytes(session) for session in self.sessions.values())
+
+    def evict(self, max_sessions=None, max_bytes=None):
+        """ Drop least recently used sessions until at most max_sessions are held and they take at most max_bytes
+        The most recently used session is kept even if it alone takes more than max_bytes
+
+        Keyword Arguments:
+            max_sessions (int) - number of sessions to keep (defaults to the registry's limit)
+            max_bytes (int) - estimated size of the loaded data to keep (defaults to the registry's limit)
+        """
+
+        if(max_sessions is None):
+            max_sessions = self.max_sessions
+
+        if(max_bytes is None):
+            max_bytes = self.max_bytes
+
+        if(max_sessions is not None):
+            while(len(self.sessions) > max_sessions):
+                self.sessions.popitem(last=False)
+
+        if(max_bytes is not None):
+            sizes = [self.get_session_bytes(session) for session in self.sessions.values()]
+
+            while(len(self.sessions) > 1 and sum(sizes) > max_bytes):
+                self.sessions.popitem(last=False)
+                sizes.pop(0)
+
+    def clear(self):
+        """ Drop every held session and event
+        """
+
+        self.sessions.clear()
+        self.events.clear()
+
+    def stats(self):
+        """ Get the hits and misses of this registry along with the number and estimated size of held sessions
+        """
+
+        return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "sessions": len(self.sessions),
+                "max_sessions": self.max_sessions,
+                "bytes": self.get_bytes(),
+                "max_bytes": self.max_bytes,
+                "events": len(self.events),
+                "max_events": self.max_events
+        }
+
+# Registry shared by everything in this process that does not supply its own
+SESSIONS = SessionRegistry()
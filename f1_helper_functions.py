@@ -1,13 +1,66 @@
+from concurrent.futures import ProcessPoolExecutor
 import fastf1
+import fastf1.exceptions
 import fastf1.plotting
 from calc_splines import calc_splines
+from interp_splines import eval_splines, interp_splines
+import gc
 import matplotlib.pyplot as plt
+from multiprocessing import resource_tracker
+from multiprocessing import shared_memory as shm_module
 import numpy as np
 import os
 import pandas as pd
+from scipy.spatial import cKDTree
+import weakref
 
 pd.set_option('display.max_columns', 100)
 
+# Default path of the offline track geometry store (see build_track_store)
+TRACK_STORE = "track_geometry.npz"
+
+# Parts of a session that can be loaded, with the session attributes each part fills
+SESSION_PARTS = {
+                 "results": ("results",),
+                 "laps": ("laps",),
+                 "telemetry": ("car_data", "pos_data"),
+                 "weather": ("weather_data",),
+                 "messages": ("race_control_messages",)
+}
+
+# Parts already requested from each session (see load_session_data), dropped along with the session
+LOADED_PARTS = weakref.WeakKeyDictionary()
+
+# Driver metadata tables built for each session (see get_driver_table), dropped along with the session
+DRIVER_TABLES = weakref.WeakKeyDictionary()
+
+# Lap indexes built for each session (see get_lap_index), dropped along with the session
+LAP_INDEXES = weakref.WeakKeyDictionary()
+
+# Bump whenever resampled output changes so cached race data is rebuilt
+RESAMPLE_VERSION = 2
+
+# Ways a telemetry column can be resampled (see resample_channels)
+RESAMPLING_POLICIES = ("linear", "previous", "nearest", "any")
+
+# Columns filled by default when resampling
+POSITION_CHANNELS = {"X": "linear", "Y": "linear"}
+
+# Channels used when laps are resampled on distance, with the time to reach each point for delta times
+DISTANCE_CHANNELS = {"ElapsedSeconds": "linear", "X": "linear", "Y": "linear", "Speed": "linear"}
+
+# Policies for every commonly used telemetry column
+TELEMETRY_CHANNELS = {
+                      "X": "linear",
+                      "Y": "linear",
+                      "Throttle": "linear",
+                      "RPM": "linear",
+                      "Speed": "linear",
+                      "Brake": "any",
+                      "nGear": "previous",
+                      "Status": "previous"
+}
+
 def cache(cache_dir=None):
     """ Initialize caching
 
@@ -72,20 +125,64 @@ def get_session_from_event(event=None, session=5):
 
     return fastf1.get_session(event.EventDate.year, event.RoundNumber, session)
 
-def load_session_data(session=None):
-    """ Load session data to cache for later use
+def load_session_data(session=None, parts=None):
+    """ Load session data to cache for later use. Only parts that have not been loaded yet are fetched,
+    so calling this again for a part the session already has costs nothing.
 
     Keyword Arguments:
         session (fastf1.core.Session) - session to be loaded
+        parts (list) - parts of SESSION_PARTS to load (None for all). Results are always loaded
     """
 
     if(session is None):
         raise Exception("Must supply a session")
 
-    session.load()
+    if(parts is None):
+        parts = SESSION_PARTS.keys()
+
+    invalid = set(parts) - set(SESSION_PARTS)
+    if(invalid):
+        raise Exception(f"Invalid session part: {', '.join(sorted(invalid))}")
+
+    loaded = get_loaded_parts(session)
+    missing = set(parts) - loaded
+    if(not missing):
+        return session
+
+    # Telemetry is cut into laps, so laps have to be loaded first (but only once)
+    telemetry = "telemetry" in missing
+    session.load(laps=("laps" in missing) or (telemetry and "laps" not in loaded),
+                 telemetry=telemetry,
+                 weather="weather" in missing,
+                 messages="messages" in missing)
+
+    # Remember what was asked for even if the session has none of it, so it is not fetched again
+    LOADED_PARTS[session] = LOADED_PARTS.get(session, set()) | missing | {"results"}
 
     return session
 
+def get_loaded_parts(session=None):
+    """ Get the parts of SESSION_PARTS that a session already has
+
+    Keyword Arguments:
+        session (fastf1.core.Session) - session to check
+    """
+
+    if(session is None):
+        raise Exception("Must supply a session")
+
+    loaded = set(LOADED_PARTS.get(session, set()))
+
+    for part, attributes in SESSION_PARTS.items():
+        try:
+            for attribute in attributes:
+                getattr(session, attribute)
+        except (AttributeError, fastf1.exceptions.DataNotLoadedError):
+            continue
+        loaded.add(part)
+
+    return loaded
+
 def get_drivers_from_session(session=None):
     """ Get a list of the drivers that participated in the specified session
 
@@ -96,57 +193,727 @@ def get_drivers_from_session(session=None):
     if(session is None):
         raise Exception("Must supply a session")
 
-    return {list(session.results.FullName)[i]: list(session.results.DriverNumber)[i] for i in range(len(list(session.results.FullName)))}
+    return dict(get_driver_table(session)["names"])
+
+def build_driver_table(session=None):
+    """ Build the driver metadata of a session from its results.
+    Returned as a dict of:
+        drivers - driver number : {"Name", "Number", "Abbreviation", "Team", "TeamColor"}
+        names - driver name : driver number, in finishing order
+        numbers - driver name, abbreviation or number : driver number
+
+    Keyword Arguments:
+        session (fastf1.core.Session) - session to get drivers from
+    """
+
+    if(session is None):
+        raise Exception("Must supply a session")
 
-def get_driver_telemetry(driver=1, session=None):
+    load_session_data(session, ["results"])
+
+    results = session.results.reindex(columns=["FullName", "DriverNumber", "Abbreviation", "TeamName", "TeamColor"])
+
+    table = {"drivers": {}, "names": {}, "numbers": {}}
+    for name, number, abbreviation, team, color in results.itertuples(index=False):
+        number = str(number)
+        table["drivers"][number] = {
+                                    "Name": name,
+                                    "Number": number,
+                                    "Abbreviation": abbreviation,
+                                    "Team": team,
+                                    "TeamColor": "#" + color if isinstance(color, str) else None
+        }
+        table["names"][name] = number
+        table["numbers"].update({name: number, number: number})
+        if(isinstance(abbreviation, str)):
+            table["numbers"][abbreviation] = number
+
+    return table
+
+def get_driver_table(session=None):
+    """ Get the driver metadata of a session, building it the first time it is asked for
+
+    Keyword Arguments:
+        session (fastf1.core.Session) - session to get drivers from
+    """
+
+    if(session is None):
+        raise Exception("Must supply a session")
+
+    if(session not in DRIVER_TABLES):
+        DRIVER_TABLES[session] = build_driver_table(session)
+
+    return DRIVER_TABLES[session]
+
+def get_driver_info(driver=None, session=None):
+    """ Get the name, number, abbreviation, team and team color of a driver
+
+    Keyword Arguments:
+        driver (int or str) - driver name, abbreviation or number
+        session (fastf1.core.Session) - session to get driver from
+    """
+
+    if(driver is None):
+        raise Exception("Must supply a driver")
+
+    table = get_driver_table(session)
+
+    number = table["numbers"].get(driver, table["numbers"].get(str(driver)))
+    if(number is None):
+        raise Exception(f"{driver} is not in the session")
+
+    return table["drivers"][number]
+
+def get_driver_telemetry(driver=1, session=None, lap_index=None):
     """ Get a driver's telemetry of all laps in the session
 
     Keyword Arguments:
         driver (int or str) - driver name or number
         session (fastf1.core.Session) - session to get telemetry from
+        lap_index (dict) - index from get_lap_index to slice from instead of merging telemetry again
     """
 
+    if(lap_index is not None):
+        return slice_lap_index(lap_index, driver)
+
     if(session is None):
         raise Exception("Must supply a session")
 
+    load_session_data(session, ["telemetry"])
+
     d = session.laps.pick_driver(driver)
 
     return d.get_telemetry()
 
-def get_driver_fastest_lap_telemetry(driver=1, session=None):
+def get_driver_fastest_lap_telemetry(driver=1, session=None, lap_index=None):
     """ Get the telemetry for the fastest lap from a driver in the session
 
     Keyword Arguments:
         driver (int or str) - driver name or number
         session (fastf1.core.Session) - session to get telemetry from
+        lap_index (dict) - index from get_lap_index to slice from instead of merging telemetry again
     """
 
+    if(lap_index is not None):
+        return slice_lap_index(lap_index, driver, fastest=True)
+
     if(session is None):
         raise Exception("Must supply a session")
 
+    load_session_data(session, ["telemetry"])
+
     d = session.laps.pick_driver(driver)
 
     return d.pick_fastest().get_telemetry()
 
-def get_all_telemetry(session=None):
+def get_all_telemetry(session=None, workers=None, shared_memory=False, lap_index=None):
     """ Get the telemetry for all drivers and all laps in a session
 
     Keyword Arguments:
         session (fastf1.core.Session) - session to get telemetry from
+        workers (int) - number of processes to extract telemetry with (None or 1 to run in this process)
+        shared_memory (bool) - return telemetry from worker processes through shared memory instead of pickling
+        lap_index (dict) - index from get_lap_index to slice from instead of merging telemetry again
+    """
+
+    if(session is None):
+        raise Exception("Must supply a session")
+
+    if(lap_index is not None):
+        return {driver: slice_lap_index(lap_index, number) for driver, number in get_drivers_from_session(session).items()}
+
+    # Load before any workers start so it is only done once
+    load_session_data(session, ["telemetry"])
+
+    return map_drivers(get_driver_telemetry, session=session, workers=workers, shared_memory=shared_memory)
+
+def build_lap_index(session=None, workers=None, shared_memory=False):
+    """ Merge the telemetry of every driver once and record where each lap starts and ends in it.
+    Returned as a dict of:
+        telemetry - telemetry of all drivers, one driver after another
+        drivers - driver number : (first row, end row)
+        laps - (driver number, lap number) : (first row, end row)
+        stints - (driver number, stint) : (first lap, last lap)
+        fastest - driver number : fastest lap number
+        overall_fastest - (driver number, lap number) of the fastest lap of the session
+        numbers - driver name, abbreviation or number : driver number
+
+    Keyword Arguments:
+        session (fastf1.core.Session) - loaded session to index
+        workers (int) - number of processes to merge telemetry with (None or 1 to run in this process)
+        shared_memory (bool) - return telemetry from worker processes through shared memory instead of pickling
+    """
+
+    if(session is None):
+        raise Exception("Must supply a session")
+
+    load_session_data(session, ["telemetry"])
+
+    names = get_drivers_from_session(session)
+    telemetries = get_all_telemetry(session, workers, shared_memory)
+
+    laps = session.laps
+    lap_groups = {str(number): rows for number, rows in laps.groupby("DriverNumber")}
+
+    index = {"drivers": {}, "laps": {}, "stints": {}, "fastest": {}, "overall_fastest": None, "numbers": {}}
+
+    overall = get_fastest_lap_number(laps)
+    if(overall is not None):
+        index["overall_fastest"] = (str(overall[0]), overall[1])
+    frames = []
+    offset = 0
+
+    for name, telemetry in telemetries.items():
+        number = str(names[name])
+        times = get_nanoseconds(telemetry["SessionTime"])
+
+        index["drivers"][number] = (offset, offset + len(telemetry))
+        index["numbers"].update({name: number, number: number})
+
+        if(number in lap_groups):
+            driver_laps = lap_groups[number].sort_values("LapNumber")
+            index["numbers"].update({abbreviation: number for abbreviation in driver_laps["Driver"].unique()})
+
+            # Fill missing lap start times with the end of the previous lap and missing end times with the next start
+            lap_start = driver_laps["LapStartTime"]
+            lap_end = driver_laps["Time"]
+            lap_start = lap_start.fillna(lap_end.shift(1))
+            lap_end = lap_end.fillna(lap_start.shift(-1))
+            valid = (lap_start.notna() & lap_end.notna()).to_numpy()
+
+            starts = np.searchsorted(times, get_nanoseconds(lap_start)[valid], side="left")
+            ends = np.searchsorted(times, get_nanoseconds(lap_end)[valid], side="right")
+
+            for lap, start, end in zip(driver_laps["LapNumber"].to_numpy()[valid], starts, ends):
+                index["laps"][(number, int(lap))] = (offset + int(start), offset + int(end))
+
+            for stint, stint_laps in driver_laps.groupby("Stint")["LapNumber"]:
+                index["stints"][(number, int(stint))] = (int(stint_laps.min()), int(stint_laps.max()))
+
+            fastest = get_fastest_lap_number(driver_laps)
+            if(fastest is not None):
+                index["fastest"][number] = fastest[1]
+
+        frames.append(telemetry)
+        offset += len(telemetry)
+
+    index["telemetry"] = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    return index
+
+def get_fastest_lap_number(laps=None):
+    """ Get the fastest lap as picked by fastf1
+    Returned as (driver number, lap number), or None if no lap counts
+
+    Keyword Arguments:
+        laps (fastf1.core.Laps) - laps to pick from
+    """
+
+    if(laps is None):
+        raise Exception("Must supply laps")
+
+    fastest = laps.pick_fastest()
+    if(fastest is None or pd.isna(fastest.get("LapNumber"))):
+        return None
+
+    return fastest["DriverNumber"], int(fastest["LapNumber"])
+
+def get_lap_index(session=None, workers=None, shared_memory=False):
+    """ Get the lap index of a session, building it the first time it is asked for
+
+    Keyword Arguments:
+        session (fastf1.core.Session) - loaded session to index
+        workers (int) - number of processes to merge telemetry with when building the index
+        shared_memory (bool) - return telemetry from worker processes through shared memory instead of pickling
+    """
+
+    if(session is None):
+        raise Exception("Must supply a session")
+
+    if(session not in LAP_INDEXES):
+        LAP_INDEXES[session] = build_lap_index(session, workers, shared_memory)
+
+    return LAP_INDEXES[session]
+
+def slice_lap_index(index=None, driver=None, laps=None, stint=None, fastest=False):
+    """ Get telemetry of a driver, a lap, a range of laps or a stint from a lap index without merging it again.
+    Lap and stint telemetry has its Distance measured from the start of the first lap.
+
+    Keyword Arguments:
+        index (dict) - index from get_lap_index
+        driver (int or str) - driver name, abbreviation or number
+        laps (int or tuple) - lap number or (first lap, last lap) to get (None for all)
+        stint (int) - stint to get (None for all)
+        fastest (bool) - get the driver's fastest lap instead of laps or stint
+    """
+
+    if(index is None):
+        raise Exception("Must supply a lap index")
+
+    if(driver is None):
+        raise Exception("Must supply a driver")
+
+    number = index["numbers"].get(driver, index["numbers"].get(str(driver)))
+    if(number is None):
+        raise Exception(f"{driver} is not in the lap index")
+
+    if(fastest):
+        if(number not in index["fastest"]):
+            raise Exception(f"{driver} has no fastest lap in the lap index")
+        laps = index["fastest"][number]
+
+    if(laps is None and stint is None):
+        start, end = index["drivers"][number]
+        return index["telemetry"].iloc[start:end]
+
+    if(stint is not None):
+        if((number, stint) not in index["stints"]):
+            raise Exception(f"Stint {stint} of {driver} is not in the lap index")
+        laps = index["stints"][(number, stint)]
+
+    first, last = (laps, laps) if np.isscalar(laps) else laps
+
+    if((number, first) not in index["laps"] or (number, last) not in index["laps"]):
+        raise Exception(f"Laps {first} to {last} of {driver} are not in the lap index")
+
+    telemetry = index["telemetry"].iloc[index["laps"][(number, first)][0]:index["laps"][(number, last)][1]]
+
+    if("Distance" in telemetry.columns and len(telemetry)):
+        telemetry = telemetry.assign(Distance=telemetry["Distance"] - telemetry["Distance"].iloc[0])
+
+    return telemetry
+
+def get_driver_telemetry_in_intervals(driver=1, session=None, interval=0.1, until=None, channels=None):
+    """ Get a driver's telemetry of all laps in the session, converted to have points at specified intervals
+
+    Keyword Arguments:
+        driver (int or str) - driver name or number
+        session (fastf1.core.Session) - session to get telemetry from
+        interval (float) - desired time in seconds between each datapoint
+        until (float or str) - end time passed to get_telemetry_in_intervals
+        channels (dict) - column : resampling policy pairs passed to get_telemetry_in_intervals
+    """
+
+    if(session is None):
+        raise Exception("Must supply a session")
+
+    telemetry = get_driver_telemetry(driver, session)
+
+    return get_telemetry_in_intervals(telemetry, interval, until=until, session=session, channels=channels)
+
+def get_all_telemetry_in_intervals(session=None, interval=0.1, until=None, channels=None, workers=None, shared_memory=False):
+    """ Get the telemetry for all drivers and all laps in a session, converted to have points at specified intervals
+
+    Keyword Arguments:
+        session (fastf1.core.Session) - session to get telemetry from
+        interval (float) - desired time in seconds between each datapoint
+        until (float or str) - end time passed to get_telemetry_in_intervals
+        channels (dict) - column : resampling policy pairs passed to get_telemetry_in_intervals
+        workers (int) - number of processes to extract and resample with (None or 1 to run in this process)
+        shared_memory (bool) - return results from worker processes through shared memory instead of pickling
+    """
+
+    if(session is None):
+        raise Exception("Must supply a session")
+
+    # Load before any workers start so it is only done once
+    load_session_data(session, ["telemetry"])
+
+    return map_drivers(get_driver_telemetry_in_intervals, session=session, args=(interval, until, channels),
+                       workers=workers, shared_memory=shared_memory)
+
+def get_lap_window(laps=None, first_lap=None, last_lap=None):
+    """ Get the session time window covering a range of laps
+    Returned as (start, end) in seconds of session time
+
+    Keyword Arguments:
+        laps (fastf1.core.Laps) - laps of the driver whose lap numbers are used
+        first_lap (int) - first lap number to include
+        last_lap (int) - last lap number to include (defaults to first_lap)
+    """
+
+    if(laps is None):
+        raise Exception("Must supply laps")
+
+    if(first_lap is None):
+        raise Exception("Must supply first_lap")
+
+    if(last_lap is None):
+        last_lap = first_lap
+
+    window = laps[(laps["LapNumber"] >= first_lap) & (laps["LapNumber"] <= last_lap)]
+    if(len(window) == 0):
+        raise Exception(f"No laps between {first_lap} and {last_lap}")
+
+    return window["LapStartTime"].min().total_seconds(), window["Time"].max().total_seconds()
+
+def get_driver_telemetry_window(driver=1, session=None, start=None, end=None, laps=None, reference=None, interval=0.1, channels=None):
+    """ Get a driver's telemetry converted to have points at specified intervals within a time or lap window.
+    Only the laps overlapping the window are merged and only the rows inside it are resampled, so the cost
+    depends on the length of the window rather than the session. Points stay on the same grid as a full resample.
+
+    Keyword Arguments:
+        driver (int or str) - driver name or number
+        session (fastf1.core.Session) - session to get telemetry from
+        start (float) - start of window in seconds from the start of the driver's data (None for start of data)
+        end (float) - end of window in seconds from the start of the driver's data (None for end of data)
+        laps (tuple) - (first_lap, last_lap) to use as the window instead of start and end
+        reference (int or str) - driver whose lap numbers are used for laps (defaults to driver)
+        interval (float) - desired time in seconds between each datapoint
+        channels (dict) - column : resampling policy pairs passed to get_telemetry_in_intervals
+    """
+
+    if(session is None):
+        raise Exception("Must supply a session")
+
+    load_session_data(session, ["telemetry"])
+
+    driver_laps = session.laps.pick_driver(driver)
+
+    # A driver's full telemetry starts at the start of their first lap, which elapsed seconds count from
+    init_time = driver_laps["LapStartTime"].min()
+    origin = init_time.total_seconds()
+
+    if(laps is not None):
+        # Lap times are in session time, so shift them to this driver's elapsed seconds
+        lap_start, lap_end = get_lap_window(driver_laps if reference is None else session.laps.pick_driver(reference), *laps)
+        start, end = lap_start - origin, lap_end - origin
+
+    # Only merge the laps that overlap the window
+    window_start = origin + (0 if start is None else start)
+    window_end = None if end is None else origin + end
+    lap_start = driver_laps["LapStartTime"].fillna(driver_laps["Time"].shift(1))
+    overlap = driver_laps["Time"] > pd.Timedelta(seconds=window_start)
+    if(window_end is not None):
+        overlap &= lap_start < pd.Timedelta(seconds=window_end)
+
+    if(not overlap.any()):
+        raise Exception(f"{driver} has no laps within the window")
+
+    telemetry = driver_laps[overlap].get_telemetry()
+    # Keep a row either side of the window to interpolate from
+    telemetry = telemetry.slice_by_time(pd.Timedelta(seconds=window_start),
+                                        telemetry["SessionTime"].iloc[-1] if window_end is None else pd.Timedelta(seconds=window_end),
+                                        pad=1, pad_side="both")
+    telemetry = telemetry.assign(ElapsedSeconds=get_elapsed_seconds(telemetry, init_time))
+
+    return get_telemetry_in_intervals(telemetry, interval, until=end, channels=channels, start=start)
+
+def get_all_telemetry_window(session=None, start=None, end=None, laps=None, reference=None, interval=0.1, channels=None, workers=None, shared_memory=False):
+    """ Get the telemetry for all drivers converted to have points at specified intervals within a time or lap window
+
+    Keyword Arguments:
+        session (fastf1.core.Session) - session to get telemetry from
+        start (float) - start of window in seconds from the start of each driver's data (None for start of data)
+        end (float) - end of window in seconds from the start of each driver's data (None for end of data)
+        laps (tuple) - (first_lap, last_lap) to use as the window instead of start and end
+        reference (int or str) - driver whose lap numbers are used for laps (defaults to the session winner)
+        interval (float) - desired time in seconds between each datapoint
+        channels (dict) - column : resampling policy pairs passed to get_telemetry_in_intervals
+        workers (int) - number of processes to extract and resample with (None or 1 to run in this process)
+        shared_memory (bool) - return results from worker processes through shared memory instead of pickling
+    """
+
+    if(session is None):
+        raise Exception("Must supply a session")
+
+    # Load before any workers start so it is only done once
+    load_session_data(session, ["telemetry"])
+
+    if(laps is not None and reference is None):
+        reference = session.results["DriverNumber"].iloc[0]
+
+    return map_drivers(get_driver_telemetry_window, session=session, args=(start, end, laps, reference, interval, channels),
+                       workers=workers, shared_memory=shared_memory)
+
+def get_data_window(driver_data=None, start=None, end=None):
+    """ Slice already resampled data to a time window without copying it
+
+    Keyword Arguments:
+        driver_data (dict) - driver : resampled telemetry pairs
+        start (float) - first time in seconds to include (None for start of data)
+        end (float) - time in seconds to stop before (None for end of data)
+    """
+
+    if(driver_data is None):
+        raise Exception("Must supply driver data")
+
+    window = {}
+    for driver, d in driver_data.items():
+        elapsed = d["ElapsedSeconds"].to_numpy()
+        first = 0 if start is None else int(np.searchsorted(elapsed, start, side="left"))
+        last = len(elapsed) if end is None else int(np.searchsorted(elapsed, end, side="left"))
+        window[driver] = d.iloc[first:last].reset_index(drop=True)
+
+    return window
+
+def resample_all_telemetry(telemetries=None, interval=0.1, until=None, session=None, channels=None, workers=None, shared_memory=False):
+    """ Convert already extracted telemetry for many drivers to have points at specified intervals
+    Returned as a dict of driver : resampled telemetry
+
+    Keyword Arguments:
+        telemetries (dict) - driver : telemetry pairs, as returned by get_all_telemetry
+        interval (float) - desired time in seconds between each datapoint
+        until (float or str) - end time passed to get_telemetry_in_intervals
+        session (fastf1.core.Session) - session to get end time from (only needed if until is "session_end")
+        channels (dict) - column : resampling policy pairs passed to get_telemetry_in_intervals
+        workers (int) - number of processes to resample with (None or 1 to run in this process)
+        shared_memory (bool) - hand telemetry to worker processes as zero-copy shared memory views instead of pickling
     """
 
+    if(telemetries is None):
+        raise Exception("Must supply telemetries")
+
+    if(workers is None or workers <= 1 or len(telemetries) <= 1):
+        return {driver: get_telemetry_in_intervals(telemetry, interval, until=until, session=session, channels=channels)
+                for driver, telemetry in telemetries.items()}
+
+    # Workers only need the end time, not the whole session
+    if(until == "session_end"):
+        if(session is None):
+            raise Exception("Must supply session when until == \"session_end\"")
+        until = get_session_length(session)
+
+    if(shared_memory):
+        # Workers must share this process's resource tracker so their blocks outlive them
+        resource_tracker.ensure_running()
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(telemetries))) as pool:
+        if(not shared_memory):
+            # Plain DataFrames so fastf1 does not pickle the session along with each telemetry
+            results = pool.map(get_telemetry_in_intervals,
+                               [pd.DataFrame(telemetry) for telemetry in telemetries.values()],
+                               [interval]*len(telemetries),
+                               [until]*len(telemetries),
+                               [None]*len(telemetries),
+                               [channels]*len(telemetries))
+
+            return dict(zip(telemetries.keys(), results))
+
+        shared = [share_frame(telemetry) for telemetry in telemetries.values()]
+        try:
+            layouts = pool.map(_resample_shared_worker,
+                               [layout for _, layout in shared],
+                               [interval]*len(telemetries),
+                               [until]*len(telemetries),
+                               [channels]*len(telemetries))
+
+            return {driver: load_shared_frame(layout) for driver, layout in zip(telemetries.keys(), layouts)}
+        finally:
+            for block, _ in shared:
+                release_shared(block, unlink=True)
+
+def _resample_shared_worker(layout, interval, until, channels):
+    block, telemetry = attach_frame(layout)
+    try:
+        result = get_telemetry_in_intervals(telemetry, interval, until=until, channels=channels)
+    finally:
+        del telemetry
+        release_shared(block)
+
+    block, result_layout = share_frame(result)
+    release_shared(block)
+
+    return result_layout
+
+def map_drivers(function=None, session=None, args=(), workers=None, shared_memory=False, drivers=None):
+    """ Call function(driver_number, session, *args) for every driver in the session
+    Returned as a dict of driver name : result
+
+    When workers is greater than 1 the drivers are split across a process pool.
+    The session is handed to each worker once when it starts (inherited without
+    copying where processes are forked), so only the results are sent back.
+    With shared_memory, DataFrame results are sent back through share_frame
+    rather than pickled.
+
+    Keyword Arguments:
+        function (callable) - module level function taking a driver number and session
+        session (fastf1.core.Session) - session to get drivers from
+        args (tuple) - extra arguments passed to function
+        workers (int) - number of processes to use (None or 1 to run in this process)
+        shared_memory (bool) - return DataFrame results through shared memory
+        drivers (dict) - driver name : number pairs to call function for (None for every driver in the session)
+    """
+
+    if(function is None):
+        raise Exception("Must supply a function")
+
     if(session is None):
         raise Exception("Must supply a session")
 
-    # Dictionary to store driver : telemetry pairs
-    telemetries = {}
+    if(drivers is None):
+        drivers = get_drivers_from_session(session)
+
+    if(workers is None or workers <= 1 or len(drivers) <= 1):
+        return {driver: function(number, session, *args) for driver, number in drivers.items()}
+
+    if(shared_memory):
+        # Workers must share this process's resource tracker so their blocks outlive them
+        resource_tracker.ensure_running()
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(drivers)), initializer=_init_driver_worker, initargs=(session,)) as pool:
+        results = pool.map(_call_driver_worker,
+                           [function]*len(drivers),
+                           drivers.values(),
+                           [args]*len(drivers),
+                           [shared_memory]*len(drivers))
 
-    # Loop through drivers and retrieve all of their telemetries
-    drivers = get_drivers_from_session(session)
-    for driver in drivers:
-        telemetries[driver] = session.laps.pick_driver(drivers.get(driver)).get_telemetry()
+        if(not shared_memory):
+            telemetries = {}
+            for (driver, number), (telemetry, result) in zip(drivers.items(), results):
+                # Reattach the session that was left behind in the worker
+                if(telemetry):
+                    result = fastf1.core.Telemetry(result, session=session, driver=number)
+                telemetries[driver] = result
 
-    return telemetries
+            return telemetries
+
+        telemetries = {}
+        for (driver, number), layout in zip(drivers.items(), results):
+            telemetries[driver] = load_shared_frame(layout)
+            # Reattach the session that was left behind in the worker
+            if(layout["telemetry"]):
+                telemetries[driver] = fastf1.core.Telemetry(telemetries[driver], session=session, driver=number)
+
+        return telemetries
+
+# Session held by each worker process started by map_drivers
+_worker_session = None
+
+def _init_driver_worker(session):
+    global _worker_session
+    _worker_session = session
+
+def _call_driver_worker(function, driver, args, shared_memory):
+    result = function(driver, _worker_session, *args)
+
+    if(not shared_memory):
+        # Plain DataFrame so fastf1 does not pickle the session along with the telemetry
+        telemetry = isinstance(result, fastf1.core.Telemetry)
+        return telemetry, pd.DataFrame(result) if telemetry else result
+
+    block, layout = share_frame(result)
+    release_shared(block)
+
+    return layout
+
+def share_frame(frame=None):
+    """ Copy the numeric columns of a DataFrame into one shared memory block
+    Returned as (block, layout)
+    Where block is the multiprocessing.shared_memory.SharedMemory holding the columns
+    and layout is a small picklable description used by attach_frame to rebuild the
+    DataFrame in another process. Columns without a numpy numeric, boolean or time
+    dtype are stored as int32 codes, with only their categories carried in the layout.
+
+    The creating process should call release_shared on the block once the layout
+    has been handed off, and unlink it once every reader is done.
+
+    Keyword Arguments:
+        frame (pd.DataFrame) - data to share
+    """
+
+    if(frame is None):
+        raise Exception("Must supply a DataFrame")
+
+    length = len(frame)
+
+    columns = []
+    values = {}
+    categories = {}
+    size = 0
+    for col in frame.columns:
+        values[col] = frame[col].to_numpy()
+        if(not isinstance(frame[col].dtype, np.dtype) or frame[col].dtype.kind not in "biufmM"):
+            # Store everything else as codes into a list of categories (-1 for missing)
+            codes, uniques = pd.factorize(frame[col])
+            values[col] = codes.astype(np.int32)
+            categories[col] = np.asarray(uniques, dtype=object)
+
+        columns.append((col, values[col].dtype.str, size))
+        # Keep every column 8 byte aligned
+        size += -(-(length*values[col].dtype.itemsize) // 8) * 8
+
+    block = shm_module.SharedMemory(create=True, size=max(size, 1))
+    for col, dtype, offset in columns:
+        np.ndarray(length, dtype=dtype, buffer=block.buf, offset=offset)[:] = values[col]
+
+    layout = {
+              "name": block.name,
+              "length": length,
+              "columns": columns,
+              "categories": categories,
+              "order": list(frame.columns),
+              "index": frame.index,
+              "telemetry": isinstance(frame, fastf1.core.Telemetry)
+    }
+
+    return block, layout
+
+def attach_frame(layout=None):
+    """ Rebuild a DataFrame shared by share_frame without copying its numeric columns
+    Returned as (block, frame)
+    Where frame's numeric columns are views into block and coded columns are decoded
+    (missing values become None). Drop every reference to frame before calling
+    release_shared on the block.
+
+    Keyword Arguments:
+        layout (dict) - layout returned by share_frame
+    """
+
+    if(layout is None):
+        raise Exception("Must supply a layout")
+
+    block = shm_module.SharedMemory(name=layout["name"])
+
+    data = {col: np.ndarray(layout["length"], dtype=dtype, buffer=block.buf, offset=offset)
+            for col, dtype, offset in layout["columns"]}
+
+    for col, categories in layout["categories"].items():
+        data[col] = np.append(categories, None)[data[col]]
+
+    frame = pd.DataFrame({col: data[col] for col in layout["order"]}, index=layout["index"], copy=False)
+
+    return block, frame
+
+def load_shared_frame(layout=None):
+    """ Copy a DataFrame shared by share_frame into this process and free its shared memory block
+
+    Keyword Arguments:
+        layout (dict) - layout returned by share_frame
+    """
+
+    if(layout is None):
+        raise Exception("Must supply a layout")
+
+    block, frame = attach_frame(layout)
+    try:
+        result = frame.copy(deep=True)
+    finally:
+        del frame
+        release_shared(block, unlink=True)
+
+    return result
+
+def release_shared(block=None, unlink=False):
+    """ Close this process's handle to a shared memory block
+
+    Keyword Arguments:
+        block (multiprocessing.shared_memory.SharedMemory) - block to close
+        unlink (bool) - also free the block for every process
+    """
+
+    if(block is None):
+        raise Exception("Must supply a shared memory block")
+
+    try:
+        block.close()
+    except BufferError:
+        # Views into the block may only be waiting on garbage collection
+        gc.collect()
+        block.close()
+
+    if(unlink):
+        block.unlink()
 
 def get_track_from_session(session=None):
     """ Get the location of the track driven on during the session
@@ -172,20 +939,104 @@ def get_track_from_event(event=None):
 
     return event.Location
 
-def get_track_geospatial(trackname=None):
+def get_track_geospatial(trackname=None, store_path=None):
     """ Get the geospatial data for the track from https://github.com/TUMFTM/racetrack-database
 
     Function no longer in use
 
+    Keyword Arguments:
+        trackname (str) - name of the track
+        store_path (str) - path to a track store from build_track_store (defaults to TRACK_STORE), only downloaded from when it does not have the track
+    """
+    if(trackname is None):
+        raise Exception("Must supply track name")
+
+    if(store_path is None):
+        store_path = TRACK_STORE
+
+    if(os.path.exists(store_path)):
+        geometry = get_track_geometry(trackname, store_path)
+        if(geometry is not None):
+            return geometry[0]
+
+    return pd.read_csv(f"https://raw.githubusercontent.com/TUMFTM/racetrack-database/master/tracks/{get_track_key(trackname)}.csv")
+
+def get_track_key(trackname=None):
+    """ Get the name a track is stored under in the racetrack database and track stores
+
     Keyword Arguments:
         trackname (str) - name of the track
     """
+
     if(trackname is None):
         raise Exception("Must supply track name")
 
-    return pd.read_csv(f"https://raw.githubusercontent.com/TUMFTM/racetrack-database/master/tracks/{trackname.replace(' ', '').title()}.csv")
+    return trackname.replace(' ', '').title()
+
+def build_track_store(sources=None, store_path=None, stepsize=None):
+    """ Precompute the centerline and edges of tracks and save them to one indexed file for offline use.
+    Tracks already in the store are kept unless they are in sources.
+
+    Keyword Arguments:
+        sources (dict) - track name : centerline/width csv (path, url or pd.DataFrame) in racetrack database format
+        store_path (str) - path of the store file (defaults to TRACK_STORE)
+        stepsize (float) - distance between points of the edges, passed to get_track_edges
+    """
+
+    if(sources is None):
+        raise Exception("Must supply sources")
+
+    if(store_path is None):
+        store_path = TRACK_STORE
+
+    arrays = {}
+    if(os.path.exists(store_path)):
+        with np.load(store_path) as store:
+            arrays = {key: store[key] for key in store.files}
+
+    for trackname, source in sources.items():
+        data = source if isinstance(source, pd.DataFrame) else pd.read_csv(source)
+        bounds = get_track_edges(data, stepsize)
+
+        key = get_track_key(trackname)
+        arrays[f"{key}.centerline"] = data.to_numpy(dtype=np.float32)
+        arrays[f"{key}.centerline_columns"] = np.array(data.columns, dtype=str)
+        arrays[f"{key}.bounds"] = bounds.to_numpy(dtype=np.float32)
+        arrays[f"{key}.bounds_columns"] = np.array(bounds.columns, dtype=str)
+
+    # Write next to the store and swap it in so readers never see a partial file
+    tmp_path = f"{store_path}.tmp-{os.getpid()}.npz"
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, store_path)
 
-def get_track_edges(data=None):
+def get_track_geometry(trackname=None, store_path=None):
+    """ Read a track's centerline and edges from a store made by build_track_store
+    Returned as (centerline, bounds) DataFrames, or None if the track is not in the store
+
+    Keyword Arguments:
+        trackname (str) - name of the track
+        store_path (str) - path of the store file (defaults to TRACK_STORE)
+    """
+
+    if(trackname is None):
+        raise Exception("Must supply track name")
+
+    if(store_path is None):
+        store_path = TRACK_STORE
+
+    key = get_track_key(trackname)
+
+    # Only the arrays of this track are read from the file
+    with np.load(store_path) as store:
+        if(f"{key}.centerline" not in store.files):
+            return None
+
+        centerline = pd.DataFrame(store[f"{key}.centerline"], columns=store[f"{key}.centerline_columns"])
+        bounds = pd.DataFrame(store[f"{key}.bounds"], columns=store[f"{key}.bounds_columns"])
+
+    return centerline, bounds
+
+def get_track_edges(data=None, stepsize=None):
     """ Use helper function from https://github.com/TUMFTM/trajectory_planning_helpers to turn data into track edges.
     Entire solution comes from TUMFTM and Alexander Heilmeier.
 
@@ -193,6 +1044,7 @@ def get_track_edges(data=None):
 
     Keyword Arguments:
         data (pd.DataFrame) - data containing middle line, right width, and left width of track
+        stepsize (float) - distance between points of the edges (None to keep the points of data)
     """
 
     if(data is None):
@@ -202,41 +1054,198 @@ def get_track_edges(data=None):
     track_imp_cl = np.vstack((track_imp, track_imp[0]))
     el_lengths_imp_cl = np.sqrt(np.sum(np.power(np.diff(track_imp_cl[:, :2], axis=0), 2), axis=1))
 
-    normvecs_normalized_imp = calc_splines(path=track_imp_cl[:, :2],
-                                            el_lengths=el_lengths_imp_cl,
-                                            use_dist_scaling=True)[3]
-    normvecs_normalized_imp_cl = np.vstack((normvecs_normalized_imp, normvecs_normalized_imp[0]))
+    coeffs_x, coeffs_y, _, normvecs_normalized_imp = calc_splines(path=track_imp_cl[:, :2],
+                                                                  el_lengths=el_lengths_imp_cl,
+                                                                  use_dist_scaling=True,
+                                                                  solver="banded",
+                                                                  return_M=False)
+
+    if(stepsize is None):
+        middle_cl = track_imp_cl[:, :2]
+        widths_cl = track_imp_cl[:, 2:4]
+        normvecs_normalized_imp_cl = np.vstack((normvecs_normalized_imp, normvecs_normalized_imp[0]))
+    else:
+        # Evenly spaced points along the splines, with widths interpolated between the original points
+        middle_cl, spline_inds, t_values, _ = interp_splines(coeffs_x, coeffs_y, incl_last_point=True, stepsize_approx=stepsize)
+        psi = eval_splines(coeffs_x, coeffs_y, spline_inds, t_values)[1]
+        normvecs_normalized_imp_cl = np.column_stack((np.cos(psi), np.sin(psi)))
+        weight = np.expand_dims(t_values, 1)
+        widths_cl = track_imp_cl[spline_inds, 2:4]*(1 - weight) + track_imp_cl[spline_inds + 1, 2:4]*weight
 
     # calculate boundaries
-    bound_right_imp_cl = track_imp_cl[:, :2] + normvecs_normalized_imp_cl * np.expand_dims(track_imp_cl[:, 2], 1)
-    bound_left_imp_cl = track_imp_cl[:, :2] - normvecs_normalized_imp_cl * np.expand_dims(track_imp_cl[:, 3], 1)
+    bound_right_imp_cl = middle_cl + normvecs_normalized_imp_cl * np.expand_dims(widths_cl[:, 0], 1)
+    bound_left_imp_cl = middle_cl - normvecs_normalized_imp_cl * np.expand_dims(widths_cl[:, 1], 1)
 
     bounds = pd.DataFrame(np.concatenate((bound_left_imp_cl, bound_right_imp_cl), axis=1))
     bounds.columns = ["outside_x", "outside_y", "inside_x", "inside_y"]
 
     return bounds
 
-def get_elapsed_seconds(telemetry=None):
+def get_smooth_outline(outline=None, stepsize=None, points=None):
+    """ Fit a closed spline through a lap's X/Y positions and resample it by equal arc length
+    Returned as a DataFrame with X, Y, Distance, Heading and Curvature columns
+
+    Keyword Arguments:
+        outline (pd.DataFrame) - telemetry of a lap (such as from get_overall_fastest)
+        stepsize (float) - approximate distance between points
+        points (int) - number of points to use instead of stepsize
+    """
+
+    if(outline is None):
+        raise Exception("Must supply an outline")
+
+    if(stepsize is None and points is None):
+        raise Exception("Must supply stepsize or points")
+
+    path = outline[["X", "Y"]].to_numpy(dtype=float)
+
+    # Repeated positions would give splines of zero length
+    path = path[np.concatenate(([True], np.any(np.diff(path, axis=0) != 0, axis=1)))]
+    if(np.all(path[0] == path[-1])):
+        path = path[:-1]
+    path_cl = np.vstack((path, path[0]))
+
+    coeffs_x, coeffs_y = calc_splines(path=path_cl, solver="banded", return_M=False)[:2]
+
+    smooth, spline_inds, t_values, dists = interp_splines(coeffs_x, coeffs_y,
+                                                          incl_last_point=True,
+                                                          stepsize_approx=stepsize,
+                                                          stepnum_fixed=None if points is None else [points])
+    psi, kappa = eval_splines(coeffs_x, coeffs_y, spline_inds, t_values)[1:]
+
+    return pd.DataFrame({"X": smooth[:, 0], "Y": smooth[:, 1], "Distance": dists, "Heading": psi, "Curvature": kappa})
+
+def simplify_outline(outline=None, points=None, tolerance=None):
+    """ Simplify a track outline with Douglas-Peucker, keeping the points that matter most to its shape.
+    Either a target number of points or a tolerance (in the units of X and Y) has to be given.
+
+    Keyword Arguments:
+        outline (pd.DataFrame) - outline with X and Y columns (e.g. from get_overall_fastest)
+        points (int) - number of points to keep
+        tolerance (float) - largest distance a removed point may be from the simplified outline
+    """
+
+    if(outline is None):
+        raise Exception("Must supply an outline")
+
+    if((points is None) == (tolerance is None)):
+        raise Exception("Must supply one of points and tolerance")
+
+    significance = get_outline_significance(outline["X"].to_numpy(dtype=float), outline["Y"].to_numpy(dtype=float))
+
+    if(points is not None):
+        keep = np.sort(np.argsort(-significance, kind="stable")[:max(points, 2)])
+    else:
+        keep = np.flatnonzero(significance > tolerance)
+
+    return outline.iloc[keep]
+
+def get_outline_significance(x, y):
+    """ Get the Douglas-Peucker tolerance below which each point of an outline is kept.
+    Keeping every point above a tolerance gives the same result as running Douglas-Peucker with it,
+    so any number of points can be picked after a single pass.
+
+    Keyword Arguments:
+        x (np.ndarray) - x coordinates of the outline
+        y (np.ndarray) - y coordinates of the outline
+    """
+
+    significance = np.zeros(len(x))
+    significance[[0, -1]] = np.inf
+
+    stack = [(0, len(x) - 1, np.inf)]
+    while(stack):
+        start, end, cap = stack.pop()
+        if(end - start < 2):
+            continue
+
+        px = x[start + 1:end] - x[start]
+        py = y[start + 1:end] - y[start]
+        dx = x[end] - x[start]
+        dy = y[end] - y[start]
+        norm = np.hypot(dx, dy)
+
+        # Distance to the chord, or to the start point for closed outlines where the chord has no length
+        if(norm > 0):
+            dist = np.abs(dx*py - dy*px)/norm
+        else:
+            dist = np.hypot(px, py)
+
+        split = int(np.argmax(dist))
+        # A point is never more significant than the split that led to it
+        value = min(dist[split], cap)
+        split += start + 1
+        significance[split] = value
+
+        stack.append((start, split, value))
+        stack.append((split, end, value))
+
+    return significance
+
+def get_elapsed_seconds(telemetry=None, init_time=None, dtype=np.float64):
     """ For each entry in telemetry, get the number of seconds since the first entry
 
+    Computed on int64 nanoseconds in one array operation, so it is exact to the nanosecond
+    before the conversion to seconds.
+
     Keyword Arguments:
         telemetry (fastf1.core.Telemetry) - telemetry data
+        init_time (pd.Timedelta) - session time to count from instead of the first entry
+        dtype (np.dtype) - float type of the result (np.float32 halves its memory)
     """
 
     if(telemetry is None):
         raise Exception("Must supply telemetry")
 
+    times = get_nanoseconds(telemetry["SessionTime"])
+    missing = np.asarray(pd.isna(telemetry["SessionTime"]))
+
     # Store initial time
-    init_time = telemetry.SessionTime.iloc[0]
+    if(init_time is None):
+        init_missing = missing[0] if len(missing) else False
+        init_time = times[0] if len(times) else 0
+    else:
+        init_missing = pd.isna(init_time)
+        init_time = get_nanoseconds(init_time)
+
+    # NaT is the smallest int64 as nanoseconds, so it is masked before it turns into a huge number of seconds
+    seconds = get_seconds(times - init_time, dtype)
+    seconds[missing | init_missing] = np.nan
+
+    return seconds
+
+def get_nanoseconds(times=None):
+    """ Convert timedeltas to int64 nanoseconds
 
-    seconds_from_start = []
-    # Calculate the number of seconds since initial time for each time
-    for time in telemetry.SessionTime:
-        seconds_from_start.append((time-init_time).total_seconds())
+    Keyword Arguments:
+        times (pd.Series, np.ndarray or pd.Timedelta) - timedeltas to convert (NaT becomes the smallest int64, so mask it with pd.isna)
+    """
+
+    if(times is None):
+        raise Exception("Must supply times")
+
+    if(np.ndim(times) == 0):
+        return np.int64(pd.Timedelta(times).value)
 
-    return seconds_from_start
+    return np.asarray(times, dtype="timedelta64[ns]").view(np.int64)
+
+def get_seconds(nanoseconds=None, dtype=np.float64):
+    """ Convert int64 nanoseconds (e.g. a difference of get_nanoseconds results) to seconds
+
+    Keyword Arguments:
+        nanoseconds (np.ndarray) - nanoseconds to convert
+        dtype (np.dtype) - float type of the result
+    """
 
-def get_telemetry_in_intervals(telemetry=None, interval=0.1, until=None, session=None):
+    if(nanoseconds is None):
+        raise Exception("Must supply nanoseconds")
+
+    # Whole seconds and the remainder are converted separately so large values lose no precision
+    whole, part = np.divmod(nanoseconds, 1_000_000_000)
+
+    return (whole + part/1e9).astype(dtype)
+
+def get_telemetry_in_intervals(telemetry=None, interval=0.1, until=None, session=None, channels=None, start=None):
     """ Convert telemetry data to have points at specified intervals
 
     Keyword Arguments:
@@ -244,6 +1253,8 @@ def get_telemetry_in_intervals(telemetry=None, interval=0.1, until=None, session
         interval (float) - desired time in seconds between each datapoint
         until (float or str) - end time in number of seconds from start or string describing end point ("data_end" or "session_end")
         session (fastf1.core.Session) - session to get end time from (only needed if until is "session_end")
+        channels (dict) - column : resampling policy pairs ("linear", "previous", "nearest" or "any"), defaults to POSITION_CHANNELS
+        start (float) - start time in number of seconds from start (None for 0). Points stay on the same grid as a full resample
     """
 
     if(telemetry is None):
@@ -252,16 +1263,21 @@ def get_telemetry_in_intervals(telemetry=None, interval=0.1, until=None, session
     if(until is None):
         until = "data_end"
 
+    if(channels is None):
+        channels = POSITION_CHANNELS
+
     if(until == "session_end" and session is None):
         raise Exception("Must supply session when until == \"session_end\"")
 
-    # Get elapsed seconds if not already provided
-    if("ElapsedSeconds" not in telemetry.columns):
-        telemetry["ElapsedSeconds"] = get_elapsed_seconds(telemetry)
+    # Get elapsed seconds if not already provided (without writing to telemetry, which may be a view of shared data)
+    if("ElapsedSeconds" in telemetry.columns):
+        elapsed = telemetry["ElapsedSeconds"].to_numpy(dtype=float)
+    else:
+        elapsed = get_elapsed_seconds(telemetry)
 
     # Get end time based on until value
     if(until == "data_end"):
-        end = list(telemetry["ElapsedSeconds"])[-1]
+        end = elapsed[-1]
     elif(until == "session_end"):
         end = get_session_length(session)
     elif(isinstance(until, float) or isinstance(until, int)):
@@ -269,55 +1285,368 @@ def get_telemetry_in_intervals(telemetry=None, interval=0.1, until=None, session
     else:
         raise Exception("Invalid value specified for until")
 
-    telemetry.reset_index(drop=True, inplace=True)
+    # Get times separated by interval as array, starting from the first grid point at or after start
+    first = 0 if start is None else max(int(np.ceil(start/interval - 1e-9)), 0)
+    intervals = np.arange(first, int(np.ceil(end/interval)))*interval
 
-    # Get times separated by interval as list
-    intervals = np.arange(0, end, interval)
+    # Only the rows around the requested times are needed
+    if(len(intervals)):
+        rows = slice(max(int(np.searchsorted(elapsed, intervals[0], side="right")) - 1, 0),
+                     int(np.searchsorted(elapsed, intervals[-1], side="right")) + 1)
+        telemetry = telemetry.iloc[rows]
+        elapsed = elapsed[rows]
 
-    # Numeric columns
-    num_cols = ["X", "Y"]#, "Throttle", "RPM", "Speed"]
-    # Categorical columns
-    cat_cols = []#"Brake", "nGear", "Status"]
+    index = get_interval_index(elapsed, intervals)
 
     # Dictionary that contains all new columns
-    interval_telemetry = {key:[] for key in ["ElapsedSeconds", "MarkerColor"]+num_cols+cat_cols}
-
-    cur_index = 0
-    for interval in intervals:
-        if(interval % 50 == 0):
-            print((interval/end)*100)
-        # Iterate through the dataframe for each interval (with minimum index to reduce size)
-        for index in telemetry[cur_index:].index:
-            if(telemetry.iloc[index]["ElapsedSeconds"] > interval):
-                # Handle numeric columns with weighted averaging
-                for col in num_cols:
-                    interval_telemetry[col] += [timing_weighted_average(
-                                                                       interval,
-                                                                       list(telemetry["ElapsedSeconds"])[index-1] if index != 0 else 0,
-                                                                       telemetry.iloc[index]["ElapsedSeconds"],
-                                                                       list(telemetry[col])[index-1],
-                                                                       telemetry.iloc[index][col]
-                    )]
-                # Handle categorical columns by maintaining previous value
-                for col in cat_cols:
-                    interval_telemetry[col] += [list(telemetry[col])[index-1]]
-
-                # Update ElapsedSeconds and current index, then break because values were found
-                interval_telemetry["ElapsedSeconds"] += [interval]
-                interval_telemetry["MarkerColor"] += [None]
-                cur_index = index
-                break
-
-            # If the end of the data has been reached, continue apppending the most recent data
-            elif(all(float(k) < interval for k in list(telemetry["ElapsedSeconds"].iloc[cur_index:])) and interval < end):
-                for col in num_cols+cat_cols:
-                    interval_telemetry[col] += [telemetry.iloc[index][col]]
-                interval_telemetry["ElapsedSeconds"] += [interval]
-                interval_telemetry["MarkerColor"] += ['rgba(0, 0, 0, .2)']
-                break
+    # Points past the end of the data hold the most recent value and are greyed out
+    interval_telemetry = {"ElapsedSeconds": intervals,
+                          "MarkerColor": np.where(index[3], 'rgba(0, 0, 0, .2)', None)}
+    interval_telemetry.update(resample_channels(telemetry, channels, index))
 
     return pd.DataFrame(interval_telemetry).reset_index(drop=True)
 
+def get_interval_index(elapsed, intervals, first=None, last=None):
+    """ Locate the telemetry points surrounding each interval time.
+    Returned as (prev_index, next_index, weight, held)
+    Where prev_index and next_index are the rows before and after each interval time,
+    weight is the fraction of the way from the previous to the next row, and held
+    marks interval times past the end of the data (which hold the last row).
+
+    Equivalent to calling timing_weighted_average for every interval time, but
+    done with a single sorted lookup so it runs in linear time.
+
+    Keyword Arguments:
+        elapsed (np.ndarray) - sorted elapsed seconds of each telemetry point
+        intervals (np.ndarray) - sorted interval times to locate
+        first (np.ndarray) - first row each interval time may use (None for the first row)
+        last (np.ndarray) - last row each interval time may use (None for the last row)
+    """
+
+    if(len(elapsed) == 0):
+        raise Exception("Must supply at least one telemetry point")
+
+    if(first is None):
+        first = 0
+
+    if(last is None):
+        last = len(elapsed) - 1
+
+    # First row strictly after each interval time
+    next_index = np.searchsorted(elapsed, intervals, side="right")
+    held = next_index > last
+
+    next_index = np.clip(next_index, first, last)
+    prev_index = np.clip(next_index - 1, first, last)
+    # Hold the last row once the end of the data has been reached
+    prev_index[held] = np.broadcast_to(last, held.shape)[held]
+
+    old_time = elapsed[prev_index]
+    new_time = elapsed[next_index]
+    span = new_time - old_time
+
+    # Weight the next value by how close the interval time is to it
+    weight = np.divide(intervals - old_time, span, out=np.zeros(len(intervals)), where=span > 0)
+    weight = np.clip(weight, 0, 1)
+
+    return prev_index, next_index, weight, held
+
+def resample_channels(telemetry=None, channels=None, index=None, first_row=0):
+    """ Resample telemetry columns at the interval times described by an index from get_interval_index.
+    Every column sharing a policy is computed together in one array operation.
+
+    Policies:
+        linear - time weighted average of the surrounding points
+        previous - hold the most recent value
+        nearest - value of whichever surrounding point is closer in time
+        any - True if the value was set at any point since the previous interval time
+
+    Keyword Arguments:
+        telemetry (pd.DataFrame) - telemetry data
+        channels (dict) - column : resampling policy pairs
+        index (tuple) - (prev_index, next_index, weight, held) from get_interval_index
+        first_row (int) - row the "any" window of the first interval time starts at (earlier rows were already used)
+    """
+
+    if(telemetry is None):
+        raise Exception("Must supply telemetry")
+
+    if(channels is None):
+        raise Exception("Must supply channels")
+
+    if(index is None):
+        raise Exception("Must supply an interval index")
+
+    prev_index, next_index, weight, held = index
+
+    invalid = set(channels.values()) - set(RESAMPLING_POLICIES)
+    if(invalid):
+        raise Exception(f"Invalid resampling policy: {', '.join(sorted(invalid))}")
+
+    # Group columns by policy so each group is resampled in a single pass
+    groups = {policy: [col for col, p in channels.items() if p == policy] for policy in RESAMPLING_POLICIES}
+
+    resampled = {}
+
+    if(groups["linear"]):
+        values = telemetry[groups["linear"]].to_numpy(dtype=float)
+        prev_values = values[prev_index]
+        result = prev_values + weight[:, None]*(values[next_index] - prev_values)
+        resampled.update({col: result[:, i] for i, col in enumerate(groups["linear"])})
+
+    if(groups["previous"]):
+        values = telemetry[groups["previous"]].to_numpy()
+        result = values[prev_index]
+        resampled.update({col: result[:, i] for i, col in enumerate(groups["previous"])})
+
+    if(groups["nearest"]):
+        values = telemetry[groups["nearest"]].to_numpy()
+        result = values[np.where(weight > .5, next_index, prev_index)]
+        resampled.update({col: result[:, i] for i, col in enumerate(groups["nearest"])})
+
+    if(groups["any"]):
+        values = telemetry[groups["any"]].to_numpy(dtype=bool)
+        # Count set values up to each row so any interval can be checked by subtraction
+        counts = np.vstack((np.zeros((1, values.shape[1]), dtype=np.int64), np.cumsum(values, axis=0)))
+        # Rows after the previous interval time, up to and including the current one
+        upper = np.where(held, len(values), next_index)
+        lower = np.concatenate(([first_row], upper[:-1]))
+        result = (counts[upper] - counts[np.minimum(lower, upper)] > 0) | values[prev_index]
+        resampled.update({col: result[:, i] for i, col in enumerate(groups["any"])})
+
+    # Keep the requested column order
+    return {col: resampled[col] for col in channels}
+
+def stream_telemetry_in_intervals(chunks=None, interval=0.1, until=None, session=None, channels=None):
+    """ Resample telemetry that arrives in chunks, yielding points at specified intervals as soon as they are complete.
+    Each yielded DataFrame holds the points completed by one chunk, and joined together they equal the output of
+    get_telemetry_in_intervals on the whole telemetry.
+
+    Only the rows still needed by the next interval time are kept between chunks, so memory does not grow
+    with the length of the session.
+
+    Keyword Arguments:
+        chunks (iterable) - telemetry DataFrames in time order (e.g. from get_telemetry_chunks or a live feed)
+        interval (float) - desired time in seconds between each datapoint
+        until (float or str) - end time in number of seconds from start or string describing end point ("data_end" or "session_end")
+        session (fastf1.core.Session) - session to get end time from (only needed if until is "session_end")
+        channels (dict) - column : resampling policy pairs, defaults to POSITION_CHANNELS
+    """
+
+    if(chunks is None):
+        raise Exception("Must supply telemetry chunks")
+
+    if(until is None):
+        until = "data_end"
+
+    if(channels is None):
+        channels = POSITION_CHANNELS
+
+    if(until == "session_end" and session is None):
+        raise Exception("Must supply session when until == \"session_end\"")
+
+    # Number of interval times to produce (unknown until the data ends for "data_end")
+    if(until == "data_end"):
+        end_tick = None
+    elif(until == "session_end"):
+        end_tick = int(np.ceil(get_session_length(session)/interval))
+    elif(isinstance(until, float) or isinstance(until, int)):
+        end_tick = int(np.ceil(until/interval))
+    else:
+        raise Exception("Invalid value specified for until")
+
+    tick = 0
+    carry = None
+    first_row = 0
+    init_time = None
+
+    for chunk in chunks:
+        if(len(chunk) == 0):
+            continue
+
+        if("ElapsedSeconds" in chunk.columns):
+            elapsed = chunk["ElapsedSeconds"].to_numpy(dtype=float)
+        else:
+            # Seconds since the first entry of the first chunk
+            if(init_time is None):
+                init_time = chunk["SessionTime"].iloc[0]
+            elapsed = get_elapsed_seconds(chunk, init_time)
+
+        frame = chunk[list(channels)].reset_index(drop=True)
+        frame["ElapsedSeconds"] = elapsed
+
+        buffer = frame if carry is None else pd.concat((carry, frame), ignore_index=True)
+        elapsed = buffer["ElapsedSeconds"].to_numpy(dtype=float)
+
+        # Interval times with a row after them are complete
+        candidates = np.arange(tick, int(np.ceil(elapsed[-1]/interval)) + 1)*interval
+        ready = tick + int(np.searchsorted(candidates, elapsed[-1], side="left"))
+        if(end_tick is not None):
+            ready = min(ready, end_tick)
+
+        if(ready > tick):
+            intervals = np.arange(tick, ready)*interval
+            yield get_stream_points(buffer, elapsed, intervals, channels, first_row)
+            tick = ready
+
+            # Keep the last row at or before the latest interval time and everything after it
+            after = int(np.searchsorted(elapsed, intervals[-1], side="right"))
+            keep = max(after - 1, 0)
+            carry = buffer.iloc[keep:].reset_index(drop=True)
+            first_row = after - keep
+        else:
+            carry = buffer
+
+        if(end_tick is not None and tick >= end_tick):
+            return
+
+    if(carry is None):
+        return
+
+    # Points past the end of the data hold the most recent value
+    elapsed = carry["ElapsedSeconds"].to_numpy(dtype=float)
+    if(end_tick is None):
+        end_tick = int(np.ceil(elapsed[-1]/interval))
+
+    if(end_tick > tick):
+        yield get_stream_points(carry, elapsed, np.arange(tick, end_tick)*interval, channels, first_row)
+
+def get_stream_points(buffer, elapsed, intervals, channels, first_row):
+    """ Resample the rows held by stream_telemetry_in_intervals at the given interval times
+
+    Keyword Arguments:
+        buffer (pd.DataFrame) - rows held by the stream
+        elapsed (np.ndarray) - elapsed seconds of each row in buffer
+        intervals (np.ndarray) - interval times to produce
+        channels (dict) - column : resampling policy pairs
+        first_row (int) - first row of buffer that no earlier interval time has used
+    """
+
+    index = get_interval_index(elapsed, intervals)
+
+    points = {"ElapsedSeconds": intervals,
+              "MarkerColor": np.where(index[3], 'rgba(0, 0, 0, .2)', None)}
+    points.update(resample_channels(buffer, channels, index, first_row))
+
+    return pd.DataFrame(points)
+
+def get_telemetry_chunks(telemetry=None, rows=1000):
+    """ Split telemetry into chunks of rows, to replay recorded telemetry through stream_telemetry_in_intervals
+
+    Keyword Arguments:
+        telemetry (pd.DataFrame) - telemetry data
+        rows (int) - number of rows in each chunk
+    """
+
+    if(telemetry is None):
+        raise Exception("Must supply telemetry")
+
+    for start in range(0, len(telemetry), rows):
+        yield telemetry.iloc[start:start + rows]
+
+def get_cumulative_distance(telemetry=None):
+    """ Get the distance driven up to each entry in telemetry, measured along its X and Y positions
+
+    Keyword Arguments:
+        telemetry (pd.DataFrame) - telemetry data with X and Y columns
+    """
+
+    if(telemetry is None):
+        raise Exception("Must supply telemetry")
+
+    steps = np.hypot(np.diff(telemetry["X"].to_numpy(dtype=float)), np.diff(telemetry["Y"].to_numpy(dtype=float)))
+
+    return np.concatenate(([0], np.cumsum(steps)))
+
+def align_laps(telemetries=None, step=1.0, until=None, channels=None, distance="Distance"):
+    """ Resample any number of laps onto one common distance grid in a single pass.
+    Returned as (grid, values)
+    Where grid is the distance of each point and values is an array of shape
+    (laps, points, channels) with the channels in the order given.
+
+    The laps are laid end to end and located with one sorted lookup, so the cost is
+    linear in the total amount of telemetry. With the default channels, subtracting
+    the ElapsedSeconds of two laps gives the delta time between them at every point.
+
+    Keyword Arguments:
+        telemetries (list) - telemetry of each lap (e.g. from get_driver_fastest_lap_telemetry)
+        step (float) - distance between each point
+        until (float) - distance to stop at (None for the end of the shortest lap)
+        channels (dict) - column : resampling policy pairs, defaults to DISTANCE_CHANNELS
+        distance (str) - column holding the distance driven (cumulative X/Y distance is used if the column is missing)
+    """
+
+    if(telemetries is None or len(telemetries) == 0):
+        raise Exception("Must supply telemetry")
+
+    if(channels is None):
+        channels = DISTANCE_CHANNELS
+
+    keys = []
+    laps = []
+    for telemetry in telemetries:
+        # Added to a copy, as the telemetry may be a view of shared data
+        if("ElapsedSeconds" in channels and "ElapsedSeconds" not in telemetry.columns):
+            telemetry = telemetry.assign(ElapsedSeconds=get_elapsed_seconds(telemetry))
+        laps.append(telemetry[list(channels)])
+
+        if(distance in telemetry.columns):
+            key = telemetry[distance].to_numpy(dtype=float)
+        else:
+            key = get_cumulative_distance(telemetry)
+
+        # Lookups need the distance to never decrease
+        keys.append(np.maximum.accumulate(key - key[0]))
+
+    if(until is None):
+        until = min(key[-1] for key in keys)
+
+    grid = np.arange(int(np.ceil(until/step)))*step
+
+    # Lay the laps end to end, each offset far enough past the last that their distances never overlap
+    lengths = np.array([len(key) for key in keys])
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    offsets = np.arange(len(keys))*(max(key[-1] for key in keys) + until + step)
+
+    combined = np.concatenate([key + offset for key, offset in zip(keys, offsets)])
+    queries = (grid[None, :] + offsets[:, None]).ravel()
+
+    # Keep every lookup within its own lap
+    first = np.repeat(starts, len(grid))
+    last = np.repeat(starts + lengths - 1, len(grid))
+
+    index = get_interval_index(combined, queries, first, last)
+    telemetry = pd.concat(laps, ignore_index=True)
+    resampled = resample_channels(telemetry, channels, index)
+
+    values = np.stack([np.asarray(resampled[col], dtype=float) for col in channels], axis=-1)
+
+    return grid, values.reshape(len(keys), len(grid), len(channels))
+
+def get_telemetry_in_distance(telemetry=None, step=1.0, until=None, channels=None, distance="Distance"):
+    """ Convert telemetry data to have points at specified distances, for comparing laps
+
+    Keyword Arguments:
+        telemetry (pd.DataFrame) - telemetry of a lap
+        step (float) - distance between each point
+        until (float) - distance to stop at (None for the end of the data)
+        channels (dict) - column : resampling policy pairs, defaults to DISTANCE_CHANNELS
+        distance (str) - column holding the distance driven (cumulative X/Y distance is used if the column is missing)
+    """
+
+    if(telemetry is None):
+        raise Exception("Must supply telemetry")
+
+    if(channels is None):
+        channels = DISTANCE_CHANNELS
+
+    grid, values = align_laps([telemetry], step, until, channels, distance)
+
+    distance_telemetry = {"Distance": grid}
+    distance_telemetry.update({col: values[0, :, i] for i, col in enumerate(channels)})
+
+    return pd.DataFrame(distance_telemetry)
+
 def timing_weighted_average(cur_time, old_time, new_time, old_val, new_val):
     """ Calculate an average weighted based on the amount of time between current point and next
 
@@ -336,17 +1665,251 @@ def timing_weighted_average(cur_time, old_time, new_time, old_val, new_val):
     # Return the weighted average - assigning more weight to the closer time
     return ((old_diff*new_val) + (new_diff*old_val))/((old_diff+new_diff))
 
-def get_overall_fastest(session=None):
+def get_overall_fastest(session=None, lap_index=None):
     """ Get the fastest lap from the session
 
     Keyword Arguments:
         session (fastf1.core.Session) - session to get fastest lap from
+        lap_index (dict) - index from get_lap_index to slice from instead of merging telemetry again
     """
+    if(lap_index is not None):
+        if(lap_index["overall_fastest"] is None):
+            raise Exception("No fastest lap in the lap index")
+        driver, lap = lap_index["overall_fastest"]
+        return slice_lap_index(lap_index, driver, laps=lap)
+
     if(session is None):
         raise Exception("Must supply a session")
 
+    load_session_data(session, ["telemetry"])
+
     return session.laps.pick_fastest().get_telemetry()
 
+def build_track_index(track_outline=None, stepsize=None):
+    """ Build a spatial index over a reference line (such as the lap from get_overall_fastest) for project_positions
+    Returned as a dict with the reference points, their distance along the lap, the lap length and a KD-tree of the points
+
+    The line is refit with a closed spline and resampled to short, even segments so that the nearest
+    segment to any position is always next to the nearest point.
+
+    Keyword Arguments:
+        track_outline (pd.DataFrame) - telemetry of the lap to use as reference
+        stepsize (float) - distance between reference points (defaults to a quarter of the median distance in track_outline)
+    """
+
+    if(track_outline is None):
+        raise Exception("Must supply a track outline")
+
+    if(stepsize is None):
+        steps = np.hypot(np.diff(track_outline["X"].to_numpy(dtype=float)), np.diff(track_outline["Y"].to_numpy(dtype=float)))
+        stepsize = np.median(steps[steps > 0])/4
+
+    reference = get_smooth_outline(track_outline, stepsize=stepsize)
+
+    # Last point closes the lap, so it is left out of the tree
+    points = reference[["X", "Y"]].to_numpy()[:-1]
+    distances = reference["Distance"].to_numpy()
+
+    return {
+            "points": points,
+            "distances": distances[:-1],
+            "length": distances[-1],
+            "tree": cKDTree(points)
+    }
+
+def project_positions(index=None, x=None, y=None):
+    """ Project positions onto the reference line of a track index
+    Returned as (distance, offset)
+    Where distance is the distance along the lap of the closest point on the line and
+    offset is the signed distance from the line (positive to the left of the driving direction).
+
+    Keyword Arguments:
+        index (dict) - index from build_track_index
+        x (np.ndarray) - x positions
+        y (np.ndarray) - y positions
+    """
+
+    if(index is None):
+        raise Exception("Must supply a track index")
+
+    if(x is None or y is None):
+        raise Exception("Must supply positions")
+
+    positions = np.column_stack((np.asarray(x, dtype=float), np.asarray(y, dtype=float)))
+    distance = np.full(len(positions), np.nan)
+    offset = np.full(len(positions), np.nan)
+
+    valid = np.all(np.isfinite(positions), axis=1)
+    positions = positions[valid]
+
+    points = index["points"]
+    count = len(points)
+    nearest = index["tree"].query(positions)[1]
+
+    # Project onto the segments before and after the nearest point and keep the closer one
+    best_dist = np.full(len(positions), np.inf)
+    best_distance = np.zeros(len(positions))
+    best_offset = np.zeros(len(positions))
+    for start in ((nearest - 1) % count, nearest):
+        end = (start + 1) % count
+        segment = points[end] - points[start]
+        seg_len = np.hypot(segment[:, 0], segment[:, 1])
+        rel = positions - points[start]
+
+        t = np.clip(np.sum(rel*segment, axis=1)/seg_len**2, 0, 1)
+        closest = points[start] + segment*t[:, None]
+        dist = np.hypot(*(positions - closest).T)
+
+        better = dist < best_dist
+        best_dist[better] = dist[better]
+        best_distance[better] = (index["distances"][start] + t*seg_len)[better]
+        best_offset[better] = ((segment[:, 0]*rel[:, 1] - segment[:, 1]*rel[:, 0])/seg_len)[better]
+
+    distance[valid] = best_distance % index["length"]
+    offset[valid] = best_offset
+
+    return distance, offset
+
+def add_track_position(driver_data=None, index=None):
+    """ Add LapDistance and LateralOffset columns to resampled data of every driver, projecting all positions in one batch
+
+    Keyword Arguments:
+        driver_data (dict) - driver : resampled telemetry pairs
+        index (dict) - index from build_track_index
+    """
+
+    if(driver_data is None):
+        raise Exception("Must supply driver data")
+
+    if(index is None):
+        raise Exception("Must supply a track index")
+
+    x = np.concatenate([d["X"].to_numpy(dtype=float) for d in driver_data.values()])
+    y = np.concatenate([d["Y"].to_numpy(dtype=float) for d in driver_data.values()])
+    distance, offset = project_positions(index, x, y)
+
+    start = 0
+    for d in driver_data.values():
+        d["LapDistance"] = distance[start:start + len(d)]
+        d["LateralOffset"] = offset[start:start + len(d)]
+        start += len(d)
+
+    return driver_data
+
+def get_time_reached(progress=None, frames=None, distance=None):
+    """ Get the time at which a driver first covered each of the distances, interpolating between frames
+    Distances not covered by the last frame are given as np.inf
+
+    Keyword Arguments:
+        progress (np.ndarray) - furthest distance covered by each frame (never decreasing)
+        frames (np.ndarray) - time of each frame
+        distance (np.ndarray) - distances to look up
+    """
+
+    if(progress is None or frames is None or distance is None):
+        raise Exception("Must supply progress, frames and distance")
+
+    after = np.searchsorted(progress, distance, side="left")
+    before = np.maximum(after - 1, 0)
+    after_frame = np.minimum(after, len(progress) - 1)
+
+    span = progress[after_frame] - progress[before]
+    fraction = np.divide(distance - progress[before], span, out=np.zeros(len(distance)), where=span > 0)
+    time = frames[before] + np.clip(fraction, 0, 1)*(frames[after_frame] - frames[before])
+
+    time[after == 0] = frames[0]
+    time[after == len(progress)] = np.inf
+
+    return time
+
+def add_race_order(driver_data=None, index=None):
+    """ Add Lap, RaceDistance, Position, GapToLeader and GapToAhead columns to resampled data of every driver.
+    Every column is computed as an array over drivers x frames, so the cost does not grow with per-frame work.
+
+    Drivers must share the same ElapsedSeconds grid (as from get_all_telemetry_in_intervals).
+    Of two drivers, the one ahead is the one that first covered the shorter of their race distances, and the gap
+    between them is how much later the other one covered it. Drivers that are held in place (after the flag or
+    once their data ends) would otherwise be ordered by projection noise, so their Position and gaps are kept from
+    the frame they were first held.
+
+    Keyword Arguments:
+        driver_data (dict) - driver : resampled telemetry pairs
+        index (dict) - index from build_track_index
+    """
+
+    if(driver_data is None):
+        raise Exception("Must supply driver data")
+
+    if(index is None):
+        raise Exception("Must supply a track index")
+
+    if(any("LapDistance" not in d.columns for d in driver_data.values())):
+        add_track_position(driver_data, index)
+
+    if(len({len(d) for d in driver_data.values()}) > 1):
+        raise Exception("All drivers must share the same ElapsedSeconds grid")
+
+    frames = driver_data[next(iter(driver_data))]["ElapsedSeconds"].to_numpy(dtype=float)
+
+    # drivers x frames
+    lap_distance = np.vstack([d["LapDistance"].to_numpy(dtype=float) for d in driver_data.values()])
+    length = index["length"]
+    lap_distance = pd.DataFrame(lap_distance.T).ffill().bfill().to_numpy().T
+
+    # Count crossings of the line, starting a lap down for cars that start behind it
+    step = np.diff(lap_distance, axis=1)
+    crossings = (step < -length/2).astype(int) - (step > length/2).astype(int)
+    laps = np.concatenate((np.where(lap_distance[:, :1] > length/2, -1, 0), crossings), axis=1).cumsum(axis=1)
+
+    race_distance = laps*length + lap_distance
+    progress = np.maximum.accumulate(race_distance, axis=1)
+    count = len(race_distance)
+
+    def get_pair_times(a, b):
+        shorter = np.minimum(race_distance[a], race_distance[b])
+        return get_time_reached(progress[a], frames, shorter), get_time_reached(progress[b], frames, shorter)
+
+    # Rank every frame by how many drivers got to the shorter distance of the two first
+    cars_ahead = np.zeros(race_distance.shape, dtype=int)
+    for a in range(count):
+        for b in range(a + 1, count):
+            time_a, time_b = get_pair_times(a, b)
+            a_ahead = (time_a < time_b) | ((time_a == time_b) & (race_distance[a] >= race_distance[b]))
+            cars_ahead[b] += a_ahead
+            cars_ahead[a] += ~a_ahead
+
+    order = np.lexsort((np.broadcast_to(np.arange(count)[:, None], race_distance.shape), cars_ahead), axis=0)
+    position = np.empty_like(order)
+    np.put_along_axis(position, order, np.arange(count)[:, None], axis=0)
+
+    leader = np.broadcast_to(order[0], race_distance.shape)
+    ahead = np.take_along_axis(order, np.maximum(position - 1, 0), axis=0)
+
+    gap_to_leader = np.zeros(race_distance.shape)
+    gap_to_ahead = np.zeros(race_distance.shape)
+    for a in range(count):
+        for b in range(a + 1, count):
+            time_a, time_b = get_pair_times(a, b)
+            for gap, target in ((gap_to_leader, leader), (gap_to_ahead, ahead)):
+                gap[a] = np.where(target[a] == b, time_a - time_b, gap[a])
+                gap[b] = np.where(target[b] == a, time_b - time_a, gap[b])
+    gap_to_ahead[position == 0] = np.nan
+
+    # Hold everything from the first frame each driver reached its final distance
+    held = np.argmax(progress >= progress[:, -1:], axis=1)
+    for i, frame in enumerate(held):
+        for column in (position, gap_to_leader, gap_to_ahead):
+            column[i, frame:] = column[i, frame]
+
+    for i, d in enumerate(driver_data.values()):
+        d["Lap"] = np.maximum(laps[i] + 1, 1)
+        d["RaceDistance"] = race_distance[i]
+        d["Position"] = position[i] + 1
+        d["GapToLeader"] = gap_to_leader[i]
+        d["GapToAhead"] = gap_to_ahead[i]
+
+    return driver_data
+
 def get_session_length(session=None):
     """ Get the total amount of time that the session took to complete
 
@@ -356,6 +1919,8 @@ def get_session_length(session=None):
     if(session is None):
         raise Exception("Must supply a session")
 
+    load_session_data(session, ["results"])
+
     return session.results.Time.iloc[0].total_seconds()
 
 def get_driver_color(name=None):
@@ -374,7 +1939,7 @@ def get_team_color(name=None, session=None):
     """ Get the driver's team color as a hex code
 
     Keyword Arguments:
-        name (str) - name of the driver
+        name (str) - name, abbreviation or number of the driver
         session (fastf1.core.Session) - session to get color from
     """
 
@@ -384,7 +1949,7 @@ def get_team_color(name=None, session=None):
     if(session is None):
         raise Exception("Must supply a session")
 
-    return "#" + session.results[session.results["FullName"] == name]["TeamColor"].iloc[0]
+    return get_driver_info(name, session)["TeamColor"]
 
 def get_track_fit_values(track_name):
     """ Returns values used to fit car positional data to track bound data.
@@ -1,74 +1,326 @@
+import base64
+from concurrent.futures import ProcessPoolExecutor
+from f1_cache import RaceCache, SessionRegistry, SESSIONS
 import f1_helper_functions as f1help
+import f1_storage
+import json
+import math
+import numpy as np
+import pandas as pd
 import plotly.graph_objects as go
 import time
-import pickle as pkl
 import os
+import shutil
 
-def prep_session(year, gp, event):
+def prep_session(year, gp, event, registry=None):
 
-    session = f1help.get_session_from_event(f1help.get_event(year, gp), event)
+    if(registry is None):
+        registry = SESSIONS
 
-    f1help.load_session_data(session)
+    # Telemetry is only loaded by prep_plotting_data, and only when the race cache misses
+    return registry.get_session(year, gp, event, ["results"])
 
-    return session
+def prep_plotting_data(year, gp, event, interval=.2, workers=None, shared_memory=False, race_cache=None, race_order=False, registry=None, timings=None):
 
-def prep_plotting_data(year, gp, event, interval=.2):
+    if(race_cache is None):
+        race_cache = RaceCache("race_data")
 
-    session = prep_session(year, gp, event)
+    if(registry is None):
+        registry = SESSIONS
 
-    track_outline = f1help.get_overall_fastest(session)
+    if(timings is None):
+        timings = {}
 
-    drivers = f1help.get_drivers_from_session(session)
-    driver_data = None
+    clock = time.perf_counter()
+
+    # Session only needs to be loaded when the data is not cached
+    session = registry.get_session(year, gp, event, parts=[])
+    key = race_cache.make_key(session, interval, until="session_end")
 
-    data_filepath=f"race_data/{year}_{gp}_{event}.pkl"
     # Load Data
-    if(data_filepath in os.listdir()):
-        with open(data_filepath, "rb") as f:
-            driver_data = pkl.load(f)
+    cached = race_cache.get(key)
+    clock = record_stage(timings, "cache_read", clock)
+    if(cached is not None):
+        return add_race_order(*cached) if race_order else cached
+
+    f1help.load_session_data(session, ["results", "laps", "telemetry"])
+    clock = record_stage(timings, "load", clock)
+
+    # Plain DataFrame so the session is not pickled along with the outline
+    track_outline = pd.DataFrame(f1help.get_overall_fastest(session))
+    clock = record_stage(timings, "outline", clock)
+
+    driver_data = f1help.get_all_telemetry_in_intervals(session, interval, until="session_end",
+                                                        workers=workers, shared_memory=shared_memory)
+
+    for driver, d in driver_data.items():
+        d["MarkerColor"] = d["MarkerColor"].fillna(f1help.get_team_color(driver, session))
+    clock = record_stage(timings, "telemetry", clock)
+
+    # Save Data
+    race_cache.put(key, (track_outline, driver_data))
+    clock = record_stage(timings, "cache_write", clock)
+
+    if(race_order):
+        return add_race_order(track_outline, driver_data)
+
+    return track_outline, driver_data
+
+def prep_race_store(year, gp, event, path, interval=.2, workers=None, max_memory=None, registry=None):
+    """ Prepare the same data as prep_plotting_data, but extract, resample and write one driver at a time
+    straight to a race store (see f1_storage) so every driver's telemetry is never held at once.
+    Returned as the path of the store, which load_race_store reads back
+
+    The first driver is prepared in this process to measure how much memory a driver takes.
+    With max_memory set, the remaining drivers are split across only as many processes as fit
+    within it. A driver is the smallest unit, as fastf1 merges a driver's telemetry in one piece.
+
+    Keyword Arguments:
+        year (int) - year of season
+        gp (int or str) - event/round/weekend identifier (round number or name)
+        event (int or str) - session identifier (number or name)
+        path (str) - path to race store directory
+        interval (float) - time in seconds between each datapoint
+        workers (int) - most processes to prepare drivers with (None or 1 to run in this process)
+        max_memory (int) - bytes of telemetry that may be held at once (None for no limit)
+        registry (SessionRegistry) - registry to get the session from
+    """
+
+    if(registry is None):
+        registry = SESSIONS
+
+    session = registry.get_session(year, gp, event, ["results", "laps", "telemetry"])
+    drivers = f1help.get_drivers_from_session(session)
+
+    track_outline = f1help.get_overall_fastest(session)
+    metadata = {
+                "year": year,
+                "gp": gp,
+                "event": event,
+                "interval": interval,
+                "outline": {col: track_outline[col].tolist() for col in ("X", "Y")}
+    }
+    del track_outline
+
+    tmp_path = f1_storage.begin_race_store(path)
+
+    try:
+        names = iter(drivers)
+        first = next(names)
+        estimate = write_store_driver(drivers[first], session, tmp_path, interval)
+
+        if(max_memory is not None):
+            workers = max(1, min(workers or 1, max_memory // max(estimate, 1)))
+
+        f1help.map_drivers(write_store_driver, session, args=(tmp_path, interval), workers=workers,
+                           drivers={name: drivers[name] for name in names})
+    except BaseException:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+
+    f1_storage.finish_race_store(tmp_path, path, list(drivers.keys()), metadata)
+
+    return path
+
+def write_store_driver(driver, session, path, interval=.2):
+    """ Extract, resample and write one driver's data to a race store being built
+    Returned as the number of bytes the driver's telemetry took in memory
+
+    Keyword Arguments:
+        driver (str) - driver number
+        session (fastf1.core.Session) - session to get telemetry from
+        path (str) - path to race store directory
+        interval (float) - time in seconds between each datapoint
+    """
+
+    name = f1help.get_driver_info(driver, session)["Name"]
+
+    telemetry = f1help.get_driver_telemetry(driver, session)
+    size = telemetry.memory_usage(deep=True).sum()
+
+    data = f1help.get_telemetry_in_intervals(telemetry, interval, until="session_end", session=session)
+    del telemetry
+
+    data["MarkerColor"] = data["MarkerColor"].fillna(f1help.get_team_color(name, session))
+    size += data.memory_usage(deep=True).sum()
+
+    f1_storage.write_driver_data(path, name, data)
+
+    return int(size)
+
+def load_race_store(path, drivers=None, start=None, end=None):
+    """ Read data written by prep_race_store
+    Returned as (track_outline, driver_data) like prep_plotting_data
+
+    Keyword Arguments:
+        path (str) - path to race store directory
+        drivers (list) - drivers to load (None for all)
+        start (float) - first time in seconds to include (None for start of data)
+        end (float) - time in seconds to stop before (None for end of data)
+    """
+
+    header = f1_storage.open_race_store(path)
+    track_outline = pd.DataFrame(header["metadata"]["outline"])
+
+    return track_outline, f1_storage.load_race_data(path, drivers, start=start, end=end)
+
+def record_stage(timings, stage, clock):
+    """ Add the seconds since clock to a stage's timing
+    Returned as the new clock
+
+    Keyword Arguments:
+        timings (dict) - stage : seconds pairs to add to
+        stage (str) - name of the stage that just finished
+        clock (float) - time.perf_counter() at the start of the stage
+    """
+
+    now = time.perf_counter()
+    timings[stage] = timings.get(stage, 0) + now - clock
+
+    return now
+
+def prep_season(year, events=("Race",), interval=.2, workers=None, race_cache=None, rounds=None):
+    """ Prepare and cache plotting data for every supported round of a season.
+    Returned as a summary of
+        rounds - (round, session) : {"status", "timings" and "error" if it failed}
+        stages - stage : total seconds over every prepared session
+        total - seconds the whole season took
+
+    Sessions that are already cached are skipped, so a run that is stopped or has
+    failures can be started again and only does the remaining work. Sessions are
+    prepared in a pool of at most workers processes.
+
+    Keyword Arguments:
+        year (int) - year of season
+        events (list) - sessions to prepare for each round (name or number)
+        interval (float) - time in seconds between each datapoint
+        workers (int) - number of sessions to prepare at once (None or 1 to run in this process)
+        race_cache (RaceCache) - cache to skip and store prepared sessions in
+        rounds (list) - round numbers to prepare (None for every supported round)
+    """
+
+    if(race_cache is None):
+        race_cache = RaceCache("race_data")
+
+    start = time.perf_counter()
+    summary = {"rounds": {}, "stages": {}, "total": 0}
+
+    # Sessions are only created here to check the cache, never loaded
+    registry = SessionRegistry(max_sessions=None)
+    jobs = []
+
+    schedule = f1help.get_schedule(year)
+    for gp, supported in zip(schedule["RoundNumber"], schedule["F1ApiSupport"]):
+        gp = int(gp)
+        if(gp < 1 or not supported or (rounds is not None and gp not in rounds)):
+            continue
+
+        for event in events:
+            try:
+                session = registry.get_session(year, gp, event, parts=[])
+            except ValueError:
+                # Round does not have this session (e.g. no sprint)
+                continue
+
+            if(os.path.exists(race_cache.get_path(race_cache.make_key(session, interval, until="session_end")))):
+                summary["rounds"][(gp, event)] = {"status": "cached", "timings": {}}
+            else:
+                jobs.append((gp, event))
+
+    registry.clear()
+
+    args = ([year]*len(jobs), [gp for gp, _ in jobs], [event for _, event in jobs], [interval]*len(jobs), [race_cache]*len(jobs))
+
+    if(workers is None or workers <= 1 or len(jobs) <= 1):
+        results = list(map(_prep_season_session, *args))
     else:
-        driver_data = f1help.get_all_telemetry(session)
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            results = list(pool.map(_prep_season_session, *args))
+
+    for job, result in zip(jobs, results):
+        summary["rounds"][job] = result
+        for stage, seconds in result["timings"].items():
+            summary["stages"][stage] = summary["stages"].get(stage, 0) + seconds
+
+    summary["total"] = time.perf_counter() - start
+
+    return summary
+
+def _prep_season_session(year, gp, event, interval, race_cache):
+    timings = {}
 
-        for driver in driver_data:
-            print(driver)
-            d = driver_data.get(driver)
-            d = f1help.get_telemetry_in_intervals(d, interval, until="session_end", session=session)
-            d["MarkerColor"].fillna(f1help.get_team_color(driver, session), inplace=True)
-            print(f"{driver} done")
-            driver_data[driver] = d
+    # Own registry so the loaded session is dropped as soon as it is prepared
+    try:
+        prep_plotting_data(year, gp, event, interval, race_cache=race_cache,
+                           registry=SessionRegistry(max_sessions=1), timings=timings)
+    except Exception as e:
+        return {"status": "failed", "timings": timings, "error": f"{type(e).__name__}: {e}"}
 
+    return {"status": "prepared", "timings": timings}
 
-        # Save Data
-        with open(data_filepath, "wb+") as f:
-            pkl.dump(driver_data, f)
+def display_season_summary(summary):
+    """ Display the status and stage timings of each session prepared by prep_season
+
+    Keyword Arguments:
+        summary (dict) - summary returned by prep_season
+    """
+
+    rows = [{"Round": gp, "Session": event, "Status": result["status"], **result["timings"], "Error": result.get("error", "")}
+            for (gp, event), result in sorted(summary["rounds"].items(), key=lambda item: (item[0][0], str(item[0][1])))]
+
+    print(pd.DataFrame(rows).round(2).to_string(index=False))
+    print(pd.Series(summary["stages"], name="Seconds").round(2).to_string())
+    print(f"Total: {summary['total']:.2f}s")
+
+def add_race_order(track_outline, driver_data):
+    """ Add track position, race order and gap columns to every driver's data for leaderboard overlays
+
+    Keyword Arguments:
+        track_outline (pd.DataFrame) - telemetry of the lap to draw the track from
+        driver_data (dict) - driver : resampled telemetry pairs
+    """
+
+    index = f1help.build_track_index(track_outline)
+    f1help.add_race_order(driver_data, index)
 
     return track_outline, driver_data
 
-def plot(track_outline, driver_data):
+def plot(track_outline, driver_data, interval=.2, speed=1, outline_points=None):
+    """ Build an animated figure with a plotly frame per datapoint
+
+    Keyword Arguments:
+        track_outline (pd.DataFrame) - telemetry of the lap to draw the track from
+        driver_data (dict) - driver : resampled telemetry pairs
+        interval (float) - time in seconds between each datapoint
+        speed (float) - playback speed as race seconds per second
+        outline_points (int) - number of points to simplify the outline to (None to keep every point)
+    """
+
+    # Time each frame is displayed for
+    frame_duration = interval*1000/speed
+
+    if(outline_points is not None):
+        track_outline = f1help.simplify_outline(track_outline, outline_points)
+
     fig = go.Figure(
-                    data=[go.Scatter(
-                               x=fastest_lap["X"],
-                               y=fastest_lap["Y"],
-                               mode="lines",
-                               line_color="rgba(85, 85, 85, 0)",
-                               line_width=6,
-                               hoverinfo="skip"
-                    ) for i in driver_data] + [
+                    data=[
                           go.Scatter(
-                                     x=fastest_lap["X"],
-                                     y=fastest_lap["Y"],
+                                     x=track_outline["X"],
+                                     y=track_outline["Y"],
                                      mode="lines",
                                      line_color="rgba(85, 85, 85, .6)",
                                      line_width=4,
                                      hoverinfo="skip"
-                          ),
+                          )
+                    ] + [
                           go.Scatter(
-                                     x=[0],
-                                     y=[0],
+                                     x=[d["X"].iloc[0]],
+                                     y=[d["Y"].iloc[0]],
+                                     text=driver,
+                                     hoverinfo="text",
                                      mode="markers",
-                                     hoverinfo="skip",
-                                     visible=False
-                          )
+                                     marker=dict(size=[15], color=[d["MarkerColor"].iloc[0]])
+                          ) for driver, d in driver_data.items()
                     ],
                     layout=go.Layout(
                                      height=900,
@@ -90,8 +342,8 @@ def plot(track_outline, driver_data):
                                                             label="Play",
                                                             method="animate",
                                                             args=[None,
-                                                                  {"frame": {"duration":interval*1000, "redraw":False},
-                                                                   "transition": {"duration":interval*1000, "easing":"linear"}}
+                                                                  {"frame": {"duration":frame_duration, "redraw":False},
+                                                                   "transition": {"duration":frame_duration, "easing":"linear"}}
                                                                   ]
                                                        )
                                                    ]
@@ -108,20 +360,281 @@ def plot(track_outline, driver_data):
                                                   mode="markers",
                                                   marker=dict(size=[15], color=[d["MarkerColor"].iloc[i]])
                                            ) for driver, d in driver_data.items()
-                                    ]
+                                    ],
+                                     # Frames only move the driver markers, which follow the outline
+                                     traces=list(range(1, len(driver_data) + 1))
                     ) for i in range(len(driver_data.get(list(driver_data.keys())[0])["X"]))]
 
           )
 
     return fig
 
+# Intervals in seconds of each level of detail built by build_frame_pyramid
+PYRAMID_LEVELS = (.1, .5, 2, 10)
+
+def build_frame_pyramid(driver_data, interval, levels=PYRAMID_LEVELS):
+    """ Build coarser levels of detail from resampled race data without resampling again
+    Returned as a dict of level interval : driver data
+
+    Each level keeps every k-th datapoint of the finest data, which on an evenly spaced
+    grid is exactly what resampling at k times the interval would produce. Levels finer
+    than interval are skipped and the others are rounded up to a multiple of it, which is
+    the interval the level is stored under.
+
+    Keyword Arguments:
+        driver_data (dict) - driver : resampled telemetry pairs
+        interval (float) - time in seconds between each datapoint of driver_data
+        levels (tuple) - desired level intervals in seconds
+    """
+
+    pyramid = {interval: driver_data}
+
+    for level in levels:
+        # Rounded up, so a level is never finer than asked for
+        step = max(1, math.ceil(level/interval - 1e-9))
+        period = round(step*interval, 9)
+        if(step <= 1 or period in pyramid):
+            continue
+        pyramid[period] = {driver: d.iloc[::step].reset_index(drop=True) for driver, d in driver_data.items()}
+
+    return dict(sorted(pyramid.items()))
+
+def select_pyramid_level(pyramid, speed=1, max_fps=10, duration=None, max_frames=None):
+    """ Pick the finest level of a frame pyramid that can be played back smoothly
+    Returned as (level interval, driver data)
+
+    Keyword Arguments:
+        pyramid (dict) - level interval : driver data, from build_frame_pyramid
+        speed (float) - playback speed as race seconds per second
+        max_fps (float) - most frames per second to display
+        duration (float) - length in seconds of the part of the race being viewed (only needed with max_frames)
+        max_frames (int) - most frames to display for the viewed part of the race
+    """
+
+    # Coarsest interval that still shows max_fps frames per second at this speed
+    needed = speed/max_fps
+    if(duration is not None and max_frames is not None):
+        needed = max(needed, duration/max_frames)
+
+    for level, driver_data in pyramid.items():
+        # Allow for rounding of level intervals
+        if(level >= needed - 1e-9):
+            return level, driver_data
+
+    return level, driver_data
+
+def get_packed_positions(driver_data):
+    """ Pack each driver's positions and marker colors into typed arrays for the compact player
+    Returned as a json serializable dict
+
+    Positions are stored as interleaved little endian float32 x/y pairs and marker colors as
+    indexes into a shared palette, both base64 encoded so they can be embedded in a page.
+
+    Keyword Arguments:
+        driver_data (dict) - driver : resampled telemetry pairs
+    """
+
+    palette = []
+    palette_index = {}
+    positions = []
+    colors = []
+
+    for driver, d in driver_data.items():
+        xy = np.column_stack((d["X"].to_numpy(), d["Y"].to_numpy())).astype("<f4")
+        positions.append(base64.b64encode(xy.tobytes()).decode("ascii"))
+
+        codes = []
+        for color in d["MarkerColor"]:
+            color = None if pd.isna(color) else color
+            if(color not in palette_index):
+                palette_index[color] = len(palette)
+                palette.append(color)
+            codes.append(palette_index[color])
+        colors.append(base64.b64encode(np.array(codes, dtype="<u2").tobytes()).decode("ascii"))
+
+    return {
+            "drivers": list(driver_data.keys()),
+            "positions": positions,
+            "colors": colors,
+            "palette": palette,
+            "frames": max(len(d) for d in driver_data.values()),
+            "start": float(min(d["ElapsedSeconds"].iloc[0] for d in driver_data.values() if len(d)))
+    }
+
+# Player embedded by write_compact_html. Advances the driver markers client side
+# from the packed arrays instead of storing a plotly frame per tick.
+COMPACT_PLAYER_SCRIPT = """
+var gd = document.getElementById('{plot_id}');
+var race = %(race)s;
+var interval = %(interval)s;
+var frameDuration = %(frame_duration)s;
+var firstTrace = %(first_trace)s;
+
+function decode(b64, Type) {
+    var bin = atob(b64);
+    var bytes = new Uint8Array(bin.length);
+    for (var i = 0; i < bin.length; i++) { bytes[i] = bin.charCodeAt(i); }
+    return new Type(bytes.buffer);
+}
+
+var positions = race.positions.map(function(p) { return decode(p, Float32Array); });
+var colors = race.colors.map(function(c) { return decode(c, Uint16Array); });
+var traces = race.drivers.map(function(_, i) { return firstTrace + i; });
+var frame = 0;
+var timer = null;
+
+var controls = document.createElement('div');
+var button = document.createElement('button');
+var slider = document.createElement('input');
+var label = document.createElement('span');
+button.textContent = 'Play';
+slider.type = 'range';
+slider.min = 0;
+slider.max = race.frames - 1;
+slider.value = 0;
+slider.style.width = '1000px';
+controls.appendChild(button);
+controls.appendChild(slider);
+controls.appendChild(label);
+gd.parentNode.insertBefore(controls, gd.nextSibling);
+
+function draw() {
+    var x = [], y = [], c = [];
+    for (var i = 0; i < positions.length; i++) {
+        var f = Math.min(frame, colors[i].length - 1);
+        x.push([positions[i][2*f]]);
+        y.push([positions[i][2*f + 1]]);
+        c.push([race.palette[colors[i][f]]]);
+    }
+    Plotly.restyle(gd, {x: x, y: y, 'marker.color': c}, traces);
+    slider.value = frame;
+    label.textContent = ' ' + (race.start + frame*interval).toFixed(1) + 's';
+}
+
+function stop() {
+    clearInterval(timer);
+    timer = null;
+    button.textContent = 'Play';
+}
+
+button.onclick = function() {
+    if (timer !== null) { stop(); return; }
+    button.textContent = 'Pause';
+    timer = setInterval(function() {
+        if (frame >= race.frames - 1) { stop(); return; }
+        frame += 1;
+        draw();
+    }, frameDuration);
+};
+
+slider.oninput = function() {
+    frame = parseInt(slider.value);
+    draw();
+};
+
+draw();
+"""
+
+def plot_compact(track_outline, driver_data, outline_points=None):
+    """ Build a figure with the track outline and one marker per driver but no animation frames.
+    Used with COMPACT_PLAYER_SCRIPT, which moves the markers from packed arrays.
+
+    Keyword Arguments:
+        track_outline (pd.DataFrame) - telemetry of the lap to draw the track from
+        driver_data (dict) - driver : resampled telemetry pairs
+        outline_points (int) - number of points to simplify the outline to (None to keep every point)
+    """
+
+    if(outline_points is not None):
+        track_outline = f1help.simplify_outline(track_outline, outline_points)
+
+    fig = go.Figure(
+                    data=[
+                          go.Scatter(
+                                     x=track_outline["X"],
+                                     y=track_outline["Y"],
+                                     mode="lines",
+                                     line_color="rgba(85, 85, 85, .6)",
+                                     line_width=4,
+                                     hoverinfo="skip"
+                          )
+                    ] + [
+                          go.Scatter(
+                                     x=[d["X"].iloc[0]],
+                                     y=[d["Y"].iloc[0]],
+                                     text=driver,
+                                     hoverinfo="text",
+                                     mode="markers",
+                                     marker=dict(size=[15], color=[d["MarkerColor"].iloc[0]])
+                          ) for driver, d in driver_data.items()
+                    ],
+                    layout=go.Layout(
+                                     height=900,
+                                     width=1350,
+                                     template="simple_white",
+                                     showlegend=False,
+                                     margin={"r":10, "t":10, "l":10, "b":10},
+                                     xaxis={
+                                            "visible":False
+                                     },
+                                     yaxis={
+                                            "visible":False
+                                     }
+                    )
+          )
+
+    return fig
+
+def write_compact_html(track_outline, driver_data, filepath, interval=.2, speed=1, outline_points=None):
+    """ Write an animated race page whose size scales with the data rather than the number of frames
+
+    Keyword Arguments:
+        track_outline (pd.DataFrame) - telemetry of the lap to draw the track from
+        driver_data (dict) - driver : resampled telemetry pairs
+        filepath (str) - path of html file to write
+        interval (float) - time in seconds between each datapoint
+        speed (float) - playback speed as race seconds per second
+        outline_points (int) - number of points to simplify the outline to (None to keep every point)
+    """
+
+    fig = plot_compact(track_outline, driver_data, outline_points)
+
+    # Plotly only substitutes {plot_id}, so the packed data is filled in first
+    script = COMPACT_PLAYER_SCRIPT % {
+                                      "race": json.dumps(get_packed_positions(driver_data)),
+                                      "interval": float(interval),
+                                      "frame_duration": float(interval*1000/speed),
+                                      "first_trace": 1
+    }
+
+    fig.write_html(filepath, include_plotlyjs=True, post_script=script)
+
+def write_pyramid_html(track_outline, pyramid, filepath, speed=1, max_fps=10, compact=True, outline_points=None):
+    """ Write an animated race page using the level of a frame pyramid suited to the playback speed
+
+    Keyword Arguments:
+        track_outline (pd.DataFrame) - telemetry of the lap to draw the track from
+        pyramid (dict) - level interval : driver data, from build_frame_pyramid
+        filepath (str) - path of html file to write
+        speed (float) - playback speed as race seconds per second
+        max_fps (float) - most frames per second to display
+        compact (bool) - write with write_compact_html instead of a plotly frame per datapoint
+        outline_points (int) - number of points to simplify the outline to (None to keep every point)
+    """
+
+    interval, driver_data = select_pyramid_level(pyramid, speed, max_fps)
+
+    if(compact):
+        write_compact_html(track_outline, driver_data, filepath, interval, speed, outline_points)
+    else:
+        plot(track_outline, driver_data, interval, speed, outline_points).write_html(filepath)
+
 def proof_of_concept_plot():
     f1help.cache()
     year=2022
     gp=9
     event="Race"
-    session = f1help.get_session_from_event(f1help.get_event(year, gp), event)
-    f1help.load_session_data(session)
+    session = prep_session(year, gp, event)
 
     """data = f1help.get_driver_fastest_lap_telemetry(driver=44, session=session)
 
@@ -143,32 +656,9 @@ def proof_of_concept_plot():
     """data["X"] = (data["X"] - list(data["X"])[0]-150)/10
     data["Y"] = (data["Y"] - list(data["Y"])[0]-100)/10"""
 
-    fastest_lap = f1help.get_overall_fastest(session)
-
-    drivers = f1help.get_drivers_from_session(session)
-    driver_data = None
     interval = .2
 
-    data_filepath=f"race_data/{year}_{gp}_{event}.pkl"
-    # Load Data
-    if(data_filepath in os.listdir()):
-        with open(data_filepath, "rb") as f:
-            driver_data = pkl.load(f)
-    else:
-        driver_data = f1help.get_all_telemetry(session)
-
-        for driver in driver_data:
-            print(driver)
-            d = driver_data.get(driver)
-            d = f1help.get_telemetry_in_intervals(d, interval, until="session_end", session=session)
-            d["MarkerColor"].fillna(f1help.get_team_color(driver, session), inplace=True)
-            print(f"{driver} done")
-            driver_data[driver] = d
-
-
-        # Save Data
-        with open(data_filepath, "wb+") as f:
-            pkl.dump(driver_data, f)
+    fastest_lap, driver_data = prep_plotting_data(year, gp, event, interval, workers=os.cpu_count(), shared_memory=True)
 
     data = driver_data.get(list(driver_data.keys())[0])
 
@@ -177,17 +667,10 @@ def proof_of_concept_plot():
     driver_team_colors = {driver: f1help.get_team_color(driver, session) for driver in driver_data}
     print(driver_team_colors)
 
+    outline = f1help.simplify_outline(fastest_lap, points=500)
+
     fig = go.Figure(
-                    data=[go.Scatter(
-                               x=fastest_lap["X"],
-                               y=fastest_lap["Y"],
-                               mode="lines",
-                               line_color="rgba(85, 85, 85, 0)",
-                               line_width=6,
-                               hoverinfo="skip",
-                               #fill="toself",
-                               #fillcolor="rgba(170,170,170,.5)"
-                    ) for i in driver_data] + [
+                    data=[
                           #go.Scatter(
                             #         x=bounds["outside_x"],
                             #         y=bounds["outside_y"],
@@ -207,22 +690,24 @@ def proof_of_concept_plot():
                                      #fillcolor="#ffffff"
                           #),
                           go.Scatter(
-                                     x=fastest_lap["X"],
-                                     y=fastest_lap["Y"],
+                                     x=outline["X"],
+                                     y=outline["Y"],
                                      mode="lines",
                                      line_color="rgba(85, 85, 85, .6)",
                                      line_width=4,
                                      hoverinfo="skip"
                                      #fill="toself",
                                      #fillcolor="rgba(170,170,170,.5)"
-                          ),
+                          )
+                    ] + [
                           go.Scatter(
-                                     x=[0],
-                                     y=[0],
+                                     x=[d["X"].iloc[0]],
+                                     y=[d["Y"].iloc[0]],
+                                     text=driver,
+                                     hoverinfo="text",
                                      mode="markers",
-                                     hoverinfo="skip",
-                                     visible=False
-                          )
+                                     marker=dict(size=[15], color=[d["MarkerColor"].iloc[0]])
+                          ) for driver, d in driver_data.items()
                     ],
                     layout=go.Layout(
                                      height=900,
@@ -262,7 +747,8 @@ def proof_of_concept_plot():
                                                   mode="markers",
                                                   marker=dict(size=[15], color=[d["MarkerColor"].iloc[i]])
                                            ) for driver, d in driver_data.items()
-                                    ]
+                                    ],
+                                     traces=list(range(1, len(driver_data) + 1))
                     ) for i in range(len(data["X"]))]
 
           )
@@ -0,0 +1,274 @@
+import json
+import numpy as np
+import os
+import pandas as pd
+import re
+import shutil
+
+# Bump whenever the on-disk layout changes
+STORE_VERSION = 1
+
+# Column every driver is indexed by when reading a time window
+TIME_COLUMN = "ElapsedSeconds"
+
+def get_file_name(name):
+    """ Turn a driver or column name into a file system safe name
+
+    Keyword Arguments:
+        name (str) - name to convert
+    """
+
+    return re.sub(r"\W+", "_", str(name)).strip("_")
+
+def write_driver_data(path=None, driver=None, data=None):
+    """ Write one driver's resampled telemetry into a race store as one contiguous array per column.
+
+    Float columns are stored as float32 (except the time column, which keeps its precision),
+    boolean and integer columns keep their dtype, and any other column is stored as integer
+    codes into a list of categories kept in the driver's header.
+
+    Keyword Arguments:
+        path (str) - path to race store directory
+        driver (str) - name of the driver
+        data (pd.DataFrame) - resampled telemetry of the driver
+    """
+
+    if(path is None):
+        raise Exception("Must supply a path")
+
+    if(driver is None):
+        raise Exception("Must supply a driver")
+
+    if(data is None):
+        raise Exception("Must supply data")
+
+    driver_dir = os.path.join(path, get_file_name(driver))
+    os.makedirs(driver_dir, exist_ok=True)
+
+    columns = []
+    for col in data.columns:
+        values = data[col].to_numpy()
+        column = {"name": col, "file": f"{get_file_name(col)}.npy", "categories": None}
+
+        if(values.dtype.kind == "f" and col != TIME_COLUMN):
+            values = values.astype(np.float32)
+        elif(values.dtype.kind not in "biuf"):
+            # Store everything else as codes into a list of categories (-1 for missing)
+            codes, categories = pd.factorize(values)
+            values = codes.astype(np.int32)
+            column["categories"] = list(categories)
+
+        np.save(os.path.join(driver_dir, column["file"]), np.ascontiguousarray(values))
+        columns.append(column)
+
+    with open(os.path.join(driver_dir, "columns.json"), "w") as f:
+        json.dump({"length": len(data), "columns": columns}, f)
+
+def write_race_header(path=None, drivers=None, metadata=None):
+    """ Write the header that makes a race store readable. Written last so a store
+    is never read before every driver has been written.
+
+    Keyword Arguments:
+        path (str) - path to race store directory
+        drivers (list) - names of the drivers written to the store
+        metadata (dict) - extra json serializable information about the race
+    """
+
+    if(path is None):
+        raise Exception("Must supply a path")
+
+    if(drivers is None):
+        raise Exception("Must supply drivers")
+
+    header = {
+              "version": STORE_VERSION,
+              "drivers": {driver: get_file_name(driver) for driver in drivers},
+              "metadata": metadata or {}
+    }
+
+    with open(os.path.join(path, "header.json"), "w") as f:
+        json.dump(header, f)
+
+def write_race_store(path=None, driver_data=None, metadata=None):
+    """ Write resampled race data to a columnar race store, replacing any existing store at path
+
+    Keyword Arguments:
+        path (str) - path to race store directory
+        driver_data (dict) - driver : resampled telemetry pairs
+        metadata (dict) - extra json serializable information about the race
+    """
+
+    if(path is None):
+        raise Exception("Must supply a path")
+
+    if(driver_data is None):
+        raise Exception("Must supply driver data")
+
+    tmp_path = begin_race_store(path)
+
+    try:
+        for driver, data in driver_data.items():
+            write_driver_data(tmp_path, driver, data)
+    except BaseException:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+
+    finish_race_store(tmp_path, path, list(driver_data.keys()), metadata)
+
+def begin_race_store(path=None):
+    """ Create an empty directory next to path to build a race store in
+    Returned as the path of the new directory
+
+    Drivers are written to it with write_driver_data, then finish_race_store
+    swaps it in, so readers never see a partly written store.
+
+    Keyword Arguments:
+        path (str) - path the race store will be moved to
+    """
+
+    if(path is None):
+        raise Exception("Must supply a path")
+
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    if(os.path.exists(tmp_path)):
+        shutil.rmtree(tmp_path)
+    os.makedirs(tmp_path)
+
+    return tmp_path
+
+def finish_race_store(tmp_path=None, path=None, drivers=None, metadata=None):
+    """ Write the header of a race store built by begin_race_store and move it to path,
+    replacing any existing store. The directory is removed if this fails.
+
+    Keyword Arguments:
+        tmp_path (str) - directory returned by begin_race_store
+        path (str) - path to race store directory
+        drivers (list) - names of the drivers written to the store
+        metadata (dict) - extra json serializable information about the race
+    """
+
+    if(tmp_path is None or path is None):
+        raise Exception("Must supply a path")
+
+    try:
+        write_race_header(tmp_path, drivers, metadata)
+
+        if(os.path.exists(path)):
+            shutil.rmtree(path)
+        os.rename(tmp_path, path)
+    except BaseException:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+
+def open_race_store(path=None):
+    """ Read the header of a race store
+
+    Keyword Arguments:
+        path (str) - path to race store directory
+    """
+
+    if(path is None):
+        raise Exception("Must supply a path")
+
+    with open(os.path.join(path, "header.json")) as f:
+        header = json.load(f)
+
+    if(header["version"] != STORE_VERSION):
+        raise Exception(f"Unsupported race store version {header['version']}")
+
+    return header
+
+def get_store_window(path=None, driver=None, start=None, end=None, header=None):
+    """ Get the rows of a driver's data that fall within a time window
+    Returned as a slice
+
+    Only the memory mapped time column is searched, so the cost does not depend
+    on the length of the session.
+
+    Keyword Arguments:
+        path (str) - path to race store directory
+        driver (str) - name of the driver
+        start (float) - first time in seconds to include (None for start of data)
+        end (float) - time in seconds to stop before (None for end of data)
+        header (dict) - header from open_race_store, read from path if not supplied
+    """
+
+    if(start is None and end is None):
+        return slice(None)
+
+    if(header is None):
+        header = open_race_store(path)
+
+    times = np.load(os.path.join(path, header["drivers"][driver], f"{get_file_name(TIME_COLUMN)}.npy"), mmap_mode="r")
+
+    first = 0 if start is None else int(np.searchsorted(times, start, side="left"))
+    last = len(times) if end is None else int(np.searchsorted(times, end, side="left"))
+
+    return slice(first, last)
+
+def load_driver_data(path=None, driver=None, columns=None, start=None, end=None, header=None):
+    """ Load one driver's data from a race store. Numeric columns are memory mapped
+    rather than read, so only the rows that are used are pulled from disk.
+
+    Keyword Arguments:
+        path (str) - path to race store directory
+        driver (str) - name of the driver
+        columns (list) - columns to load (None for all)
+        start (float) - first time in seconds to include (None for start of data)
+        end (float) - time in seconds to stop before (None for end of data)
+        header (dict) - header from open_race_store, read from path if not supplied
+    """
+
+    if(path is None):
+        raise Exception("Must supply a path")
+
+    if(driver is None):
+        raise Exception("Must supply a driver")
+
+    if(header is None):
+        header = open_race_store(path)
+
+    if(driver not in header["drivers"]):
+        raise Exception(f"{driver} is not in the race store")
+
+    driver_dir = os.path.join(path, header["drivers"][driver])
+    with open(os.path.join(driver_dir, "columns.json")) as f:
+        stored = json.load(f)["columns"]
+
+    if(columns is not None):
+        stored = [column for column in stored if column["name"] in columns]
+
+    window = get_store_window(path, driver, start, end, header)
+
+    data = {}
+    for column in stored:
+        values = np.load(os.path.join(driver_dir, column["file"]), mmap_mode="r")[window]
+        if(column["categories"] is not None):
+            # Decode categories, leaving missing values as None
+            categories = np.array(column["categories"] + [None], dtype=object)
+            values = categories[values]
+        data[column["name"]] = values
+
+    return pd.DataFrame(data, copy=False)
+
+def load_race_data(path=None, drivers=None, columns=None, start=None, end=None):
+    """ Load data from a race store
+    Returned as a dict of driver : data
+
+    Keyword Arguments:
+        path (str) - path to race store directory
+        drivers (list) - drivers to load (None for all)
+        columns (list) - columns to load (None for all)
+        start (float) - first time in seconds to include (None for start of data)
+        end (float) - time in seconds to stop before (None for end of data)
+    """
+
+    if(path is None):
+        raise Exception("Must supply a path")
+
+    header = open_race_store(path)
+
+    if(drivers is None):
+        drivers = list(header["drivers"].keys())
+
+    return {driver: load_driver_data(path, driver, columns, start, end, header) for driver in drivers}
@@ -0,0 +1,164 @@
+import numpy as np
+import math
+
+
+def eval_splines(coeffs_x: np.ndarray,
+                 coeffs_y: np.ndarray,
+                 spline_inds: np.ndarray,
+                 t_values: np.ndarray) -> tuple:
+    """
+    .. description::
+    Evaluate splines from calc_splines at any number of (spline index, t) pairs in one vectorized call.
+
+    .. inputs::
+    :param coeffs_x:            spline coefficients of the x-component (as returned by calc_splines).
+    :type coeffs_x:             np.ndarray
+    :param coeffs_y:            spline coefficients of the y-component (as returned by calc_splines).
+    :type coeffs_y:             np.ndarray
+    :param spline_inds:         index of the spline every point lies on.
+    :type spline_inds:          np.ndarray
+    :param t_values:            spline parameter of every point (0 <= t <= 1).
+    :type t_values:             np.ndarray
+
+    .. outputs::
+    :return path:               x and y coordinates of the points.
+    :rtype path:                np.ndarray
+    :return psi:                heading of the points (0 = north, in the range -pi to pi).
+    :rtype psi:                 np.ndarray
+    :return kappa:              curvature of the points.
+    :rtype kappa:               np.ndarray
+
+    .. notes::
+    The normalized normal vector of a point (as used by calc_splines) is [cos(psi), sin(psi)].
+    """
+
+    spline_inds = np.asarray(spline_inds, dtype=int)
+    t = np.asarray(t_values, dtype=float)
+
+    cx = coeffs_x[spline_inds]
+    cy = coeffs_y[spline_inds]
+
+    # P(t) = a_0 + a_1 * t + a_2 * t² + a_3 * t³ (Horner scheme)
+    x = cx[:, 0] + t * (cx[:, 1] + t * (cx[:, 2] + t * cx[:, 3]))
+    y = cy[:, 0] + t * (cy[:, 1] + t * (cy[:, 2] + t * cy[:, 3]))
+
+    # first and second derivatives
+    dx = cx[:, 1] + t * (2 * cx[:, 2] + 3 * t * cx[:, 3])
+    dy = cy[:, 1] + t * (2 * cy[:, 2] + 3 * t * cy[:, 3])
+    ddx = 2 * cx[:, 2] + 6 * t * cx[:, 3]
+    ddy = 2 * cy[:, 2] + 6 * t * cy[:, 3]
+
+    # heading with north = 0 (consistent with psi_s and psi_e in calc_splines)
+    psi = np.arctan2(dy, dx) - math.pi / 2
+    psi = (psi + math.pi) % (2 * math.pi) - math.pi
+
+    kappa = (dx * ddy - dy * ddx) / np.power(dx * dx + dy * dy, 1.5)
+
+    return np.column_stack((x, y)), psi, kappa
+
+
+def calc_spline_lengths(coeffs_x: np.ndarray,
+                        coeffs_y: np.ndarray,
+                        no_interp_points: int = 20) -> tuple:
+    """
+    .. description::
+    Approximate the length of every spline by sampling it at no_interp_points and summing the distances.
+
+    .. outputs::
+    :return spline_lengths:     length of every spline.
+    :rtype spline_lengths:      np.ndarray
+    :return dists_cum:          cumulated distance at every sample point (shape no_splines x no_interp_points).
+    :rtype dists_cum:           np.ndarray
+    """
+
+    no_splines = coeffs_x.shape[0]
+    t_steps = np.linspace(0.0, 1.0, no_interp_points)
+
+    path = eval_splines(coeffs_x,
+                        coeffs_y,
+                        np.repeat(np.arange(no_splines), no_interp_points),
+                        np.tile(t_steps, no_splines))[0].reshape(no_splines, no_interp_points, 2)
+
+    steps = np.sqrt(np.sum(np.power(np.diff(path, axis=1), 2), axis=2))
+    dists_cum = np.concatenate((np.zeros((no_splines, 1)), np.cumsum(steps, axis=1)), axis=1)
+
+    return dists_cum[:, -1], dists_cum
+
+
+def interp_splines(coeffs_x: np.ndarray,
+                   coeffs_y: np.ndarray,
+                   spline_lengths: np.ndarray = None,
+                   incl_last_point: bool = False,
+                   stepsize_approx: float = None,
+                   stepnum_fixed: list = None,
+                   no_interp_points: int = 20) -> tuple:
+    """
+    .. description::
+    Resample splines from calc_splines by equal arc length. Either an approximate step size or a fixed number of
+    points has to be given. The arc length along every spline is approximated by sampling it at no_interp_points, and
+    the parameters of the new points are found by interpolating within those samples, all in vectorized calls.
+
+    .. inputs::
+    :param coeffs_x:            spline coefficients of the x-component.
+    :type coeffs_x:             np.ndarray
+    :param coeffs_y:            spline coefficients of the y-component.
+    :type coeffs_y:             np.ndarray
+    :param spline_lengths:      lengths of the splines (optional, only used to set the number of points).
+    :type spline_lengths:       np.ndarray
+    :param incl_last_point:     bool flag to include the end point of the last spline.
+    :type incl_last_point:      bool
+    :param stepsize_approx:     desired distance between the points, adjusted to divide the path equally.
+    :type stepsize_approx:      float
+    :param stepnum_fixed:       [number of points] to use instead of stepsize_approx.
+    :type stepnum_fixed:        list
+    :param no_interp_points:    number of samples per spline used to approximate its length.
+    :type no_interp_points:     int
+
+    .. outputs::
+    :return path_interp:        x and y coordinates of the resampled points.
+    :rtype path_interp:         np.ndarray
+    :return spline_inds:        index of the spline every point lies on.
+    :rtype spline_inds:         np.ndarray
+    :return t_values:           spline parameter of every point.
+    :rtype t_values:            np.ndarray
+    :return dists_interp:       distance of every point from the start of the path.
+    :rtype dists_interp:        np.ndarray
+    """
+
+    # check inputs
+    if (stepsize_approx is None and stepnum_fixed is None) \
+            or (stepsize_approx is not None and stepnum_fixed is not None):
+        raise RuntimeError("Provide one of 'stepsize_approx' and 'stepnum_fixed'!")
+
+    no_splines = coeffs_x.shape[0]
+
+    # length of every spline and the cumulated distance over all samples
+    lengths, dists_cum = calc_spline_lengths(coeffs_x, coeffs_y, no_interp_points)
+    if spline_lengths is None:
+        spline_lengths = lengths
+
+    # global parameter u = spline index + t and the distance at every sample of u
+    offsets = np.concatenate(([0.0], np.cumsum(lengths)[:-1]))
+    u_samples = (np.arange(no_splines)[:, None] + np.linspace(0.0, 1.0, no_interp_points)[None, :]).ravel()
+    dist_samples = (offsets[:, None] + dists_cum).ravel()
+
+    # number of points on the whole path
+    total_length = np.sum(spline_lengths)
+    if stepnum_fixed is None:
+        no_points = math.ceil(total_length / stepsize_approx) + 1
+    else:
+        no_points = int(np.sum(stepnum_fixed))
+
+    dists_interp = np.linspace(0.0, np.sum(lengths), no_points)
+
+    if not incl_last_point:
+        dists_interp = dists_interp[:-1]
+
+    # invert the distance samples to find the parameter of every point
+    u = np.interp(dists_interp, dist_samples, u_samples)
+    spline_inds = np.minimum(np.floor(u).astype(int), no_splines - 1)
+    t_values = u - spline_inds
+
+    path_interp = eval_splines(coeffs_x, coeffs_y, spline_inds, t_values)[0]
+
+    return path_interp, spline_inds, t_values, dists_interp
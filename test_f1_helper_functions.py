@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import f1_helper_functions as f1help
+
+def make_race(radius=200, race_laps=3):
+    """ Resampled data of cars lapping a circle, held just past the line once they finish
+    Later finishers are held further past it, as projection noise can place them
+
+    Keyword Arguments:
+        radius (float) - radius of the circle
+        race_laps (int) - number of laps in the race
+    """
+
+    angles = np.linspace(0, 2*np.pi, 400, endpoint=False)
+    outline = pd.DataFrame({"X": radius*np.cos(angles), "Y": radius*np.sin(angles)})
+    index = f1help.build_track_index(outline)
+
+    frames = np.arange(0, 100, 0.2)
+    finish = race_laps*index["length"]
+    driver_data = {}
+    for grid, (driver, speed, overshoot) in enumerate((("VER", 60, 0), ("PER", 59, 3), ("LEC", 58, 1), ("SAI", 57, 4))):
+        distance = np.minimum(speed*frames - 10*grid, finish + overshoot)
+        angle = distance/radius
+        driver_data[driver] = pd.DataFrame({"ElapsedSeconds": frames, "X": radius*np.cos(angle), "Y": radius*np.sin(angle)})
+
+    return index, driver_data
+
+def test_race_order_keeps_finishing_order():
+    index, driver_data = make_race()
+    f1help.add_race_order(driver_data, index)
+
+    assert [d["Position"].iloc[-1] for d in driver_data.values()] == [1, 2, 3, 4]
+
+def test_race_order_gaps_stop_at_the_flag():
+    index, driver_data = make_race()
+    f1help.add_race_order(driver_data, index)
+
+    for driver in ("PER", "LEC", "SAI"):
+        d = driver_data[driver]
+        held = d["RaceDistance"].idxmax()
+
+        assert d["GapToLeader"].iloc[held:].nunique() == 1
+        assert d["GapToAhead"].iloc[held:].nunique() == 1
+        assert 0 < d["GapToLeader"].iloc[-1] < 5
+
+def test_elapsed_seconds_keeps_missing_times_missing():
+    telemetry = pd.DataFrame({"SessionTime": pd.to_timedelta([1, None, 2], unit="s")})
+
+    np.testing.assert_array_equal(f1help.get_elapsed_seconds(telemetry), [0, np.nan, 1])
+    np.testing.assert_array_equal(f1help.get_elapsed_seconds(telemetry, pd.Timedelta(seconds=0)), [1, np.nan, 2])